@@ -0,0 +1,63 @@
+import weakref
+from datetime import datetime as dtdt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from record import AddressBook
+
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class ContactColumns:
+    """
+    Column store of the address book for reports over many contacts.
+
+    Birthdays are kept as month/day arrays, so the histograms run as
+    vectorized counts. Requires NumPy.
+    """
+
+    def __init__(self, book: AddressBook):
+        if np is None:
+            raise ImportError("NumPy is required for contact analytics.")
+        months, days = [], []
+        with book.lock.read():
+            for record in book.values():
+                bday = record.birthday.value if record.birthday else None
+                months.append(bday.month if bday else 0)
+                days.append(bday.day if bday else 0)
+            self.version = book._version
+        self.months = np.array(months, dtype=np.int8)
+        self.days = np.array(days, dtype=np.int8)
+        self.book = weakref.ref(book)
+
+    def birthdays_per_month(self) -> dict:
+        """Return the number of birthdays in every month."""
+        counts = np.bincount(self.months[self.months > 0], minlength=13)[1:]
+        return dict(zip(MONTHS, counts.tolist()))
+
+    def birthdays_per_weekday(self, year: int | None = None) -> dict:
+        """Return the number of birthdays falling on every weekday of the year."""
+        year = year or dtdt.now().year
+        has_bday = self.months > 0
+        dates = (np.datetime64(str(year), "M") + (self.months[has_bday].astype(np.int64) - 1)).astype("M8[D]")
+        dates = dates + (self.days[has_bday].astype(np.int64) - 1)
+        # 1970-01-01 був четвергом
+        weekdays = (dates.astype(np.int64) + 3) % 7
+        counts = np.bincount(weekdays, minlength=7)
+        return dict(zip(WEEKDAYS, counts.tolist()))
+
+
+_columns = {}
+
+
+def columns(book: AddressBook) -> ContactColumns:
+    """Return the column store of the book, rebuilding it after changes."""
+    cached = _columns.get(id(book))
+    if cached is None or cached.book() is not book or cached.version != book._version:
+        cached = _columns[id(book)] = ContactColumns(book)
+    return cached
@@ -1,32 +1,108 @@
-import pickle
+import json
 import os
-
-from colorama import Fore, Style
+import shlex
+import sys
+import time
+from functools import partial
+from types import SimpleNamespace
 
 from utils import input_error
 from models import Name, Phone, Birthday, Address, Email, NoteText, Title
 from record import AddressBook, Record, NoteBook, Note
-from ui_helpers import user_input, user_output, extend_contact_interactive, main_user_input
+from ui_helpers import user_input, user_output, output, extend_contact_interactive, main_user_input, set_script_answers
 from tableview import show_table, show_help_table
+from storage import JournalStorage, DATA_FILE, open_storage
+from commands import command, register, GENERAL, CONTACTS, ADDRESS, EMAIL, BIRTHDAY, NOTES
+import commands
+import metrics
 from prompt_variants import (get_prompts, title_prompts, text_prompt, edit_note_prompt, edit_text_prompt, title_search_prompt, delete_note_prompt)
 
+PAGE_SIZE = 50
+NO_CONTACT = "No contact with that name.", "warning"
 
-def output(message: str, mtype: str):
-    if mtype == 'success':
-        user_output(Fore.GREEN + message + Style.RESET_ALL)
-    elif mtype == 'warning':
-        user_output(Fore.YELLOW + message + Style.RESET_ALL)
-    elif mtype == 'error':
-        user_output(Fore.RED + message + Style.RESET_ALL)
-    elif mtype == 'common list':
-        for m in message:
-            user_output(Fore.BLUE + m + Style.RESET_ALL)
-    elif mtype == 'common':
-        user_output(Fore.BLUE + message + Style.RESET_ALL)
-    else:
-        user_output(message)
+
+@command("hello", GENERAL, "Greet the assistant", readonly=True)
+def hello() -> tuple:
+    return "How can I help you?", "info"
+
+
+@command("help", GENERAL, "Show all available commands", output="help", readonly=True)
+def show_help() -> tuple:
+    return None, "help"
+
+
+@command("exit", GENERAL, "Exit the assistant", output="exit", aliases=("close",))
+def goodbye() -> tuple:
+    return "Good bye!", "info"
 
 
+@command("stats", GENERAL, "Show command timings; [on | off] timing of book methods, [reset]", arity=0,
+         readonly=True)
+def stats(args: list) -> tuple:
+    """
+    Show the number, latency and phases of the commands run so far.
+
+    "stats on" also times the book methods and field validators, "stats off"
+    stops it, "stats reset" clears the statistics.
+
+    Args:
+        args (list): Argument list from command line.
+
+    Returns:
+        tuple: Statistics report or message.
+    """
+    action = args[0].lower() if args else ""
+    if action == "on":
+        metrics.enable()
+        return "Book methods and validators are timed now.", "success"
+    if action == "off":
+        metrics.disable()
+        return "Book methods and validators are no longer timed.", "success"
+    if action == "reset":
+        metrics.reset()
+        return "Statistics cleared.", "success"
+    if action:
+        return "Usage: stats [on | off | reset]", "warning"
+    return metrics.report(), "common"
+
+
+@command("profile", GENERAL, "Profile the next commands with cProfile and tracemalloc: on | off", arity=1)
+def profile(args: list) -> tuple:
+    """
+    Start or stop profiling of the commands.
+
+    Args:
+        args (list): "on" or "off".
+
+    Returns:
+        tuple: Message, or the profile report after "off".
+    """
+    action = args[0].lower()
+    if not metrics.can_profile():
+        return "⚠️  Profiling is not available in server mode, run the commands locally.", "warning"
+    if action == "on":
+        if metrics.profiling():
+            return "⚠️  Profiling is already on.", "warning"
+        metrics.start_profile()
+        return "Profiling started. Run some commands, then 'profile off'.", "success"
+    if action == "off":
+        if not metrics.profiling():
+            return "⚠️  Profiling is not on.", "warning"
+        return metrics.stop_profile(), "common"
+    return "Usage: profile on | off", "warning"
+
+
+def parse_days(args: list) -> int:
+    """Parse the optional number of days of the "birthdays" command."""
+    if not args:
+        return 7
+    try:
+        return int(args[0])
+    except ValueError:
+        raise ValueError("Number of days must be a number.")
+
+
+@command("add-contact", CONTACTS, "Add a new contact", book="contacts", arity=2, prompts=2)
 @input_error
 def add_contact(args: list, book: AddressBook) -> tuple:
     """
@@ -42,12 +118,15 @@ def add_contact(args: list, book: AddressBook) -> tuple:
     name, phone, *_ = args
     if phone == "":
         return "Enter a phone number.", "warning"
-    record = book.find(name)
-    if type(record) is tuple:
+    record = book.find_or_none(name)
+    if record is None:
         record = Record(name)
         message = record.add_phone(phone)
         if message[1] in ["warning", "error"]:
             return message
+        owner = book.phone_conflict(record.name.value, [Phone.pack(phone)])
+        if owner is not None:
+            return f"⚠️  Phone {phone} already belongs to {owner.capitalize()}.", "warning"
         book.add_record(record)
         extend_contact_interactive(record, book)
     else:
@@ -55,6 +134,7 @@ def add_contact(args: list, book: AddressBook) -> tuple:
     return message
 
 
+@command("change-contact", CONTACTS, "Change a contact's phone number", book="contacts", arity=3)
 @input_error
 def change_contact(args: list, book: AddressBook) -> tuple:
     """
@@ -68,19 +148,23 @@ def change_contact(args: list, book: AddressBook) -> tuple:
         tuple: Message.
     """
     name, old_phone, new_phone, *_ = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        message = record.edit_phone(old_phone, new_phone)
-        return message
-    else:
-        return record
+    record = book.find_or_none(name)
+    if record is None:
+        return NO_CONTACT
+    return record.edit_phone(old_phone, new_phone)
 
 
+@command("find-contact", CONTACTS, "Find contacts by keyword, [--prefix | --fuzzy]", book="contacts", arity=1,
+         output="table", readonly=True)
 @input_error
 def find_contact(args: list, book: AddressBook) -> tuple:
     """
     Find a contact in the address book.
 
+    "--prefix KEYWORD" finds contacts with a keyword starting with it (e.g. the
+    first digits of a phone), "--fuzzy KEYWORD" finds names and emails with
+    a few typos, closest first.
+
     Args:
         args (list): Argument list from command line.
         book (AddressBook): Address book to save records.
@@ -88,11 +172,17 @@ def find_contact(args: list, book: AddressBook) -> tuple:
     Returns:
         tuple: tuple with list of contacts of message.
     """
+    if args[0] in ("--fuzzy", "--prefix"):
+        mode, keyword, *_ = args
+        if mode == "--fuzzy":
+            return book.find_fuzzy(keyword)
+        return book.find_by_prefix(keyword)
     keyword, *_ = args
     records = book.find_by_keyword(keyword)
     return records
 
 
+@command("delete-contact", CONTACTS, "Delete a contact", book="contacts", arity=1)
 @input_error
 def delete_contact(args: list, book: AddressBook) -> tuple:
     """
@@ -106,14 +196,33 @@ def delete_contact(args: list, book: AddressBook) -> tuple:
         tuple: Message.
     """
     name, *_ = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        message = book.delete(name)
-        return message
-    else:
-        return record
+    return book.delete(name)
+
+
+@command("who-is", CONTACTS, "Find the contact with a phone number", book="contacts", arity=1, output="table",
+         readonly=True)
+@input_error
+def who_is(args: list, book: AddressBook) -> tuple:
+    """
+    Find whose phone number it is.
+
+    The number may be written with spaces, dashes or the +38 code, so it can be
+    given as several arguments.
+
+    Args:
+        args (list): Argument list from command line.
+        book (AddressBook): Address book to search in.
+
+    Returns:
+        tuple: Tuple with the contact row or with message.
+    """
+    phone = " ".join(args)
+    if Phone.pack(phone) is None:
+        return "Please enter a valid phone number.", "warning"
+    return book.who_is(phone)
 
 
+@command("clear-all-contacts", CONTACTS, "Clear all contacts", book="contacts")
 @input_error
 def clear_all_contacts(book: AddressBook):
     """
@@ -128,6 +237,7 @@ def clear_all_contacts(book: AddressBook):
     return book.clear_all_contacts()
 
 
+@command("show-phone", CONTACTS, "Show phone numbers of a contact", book="contacts", arity=1, readonly=True)
 @input_error
 def show_phone(args: list, book: AddressBook) -> tuple:
     """
@@ -141,36 +251,51 @@ def show_phone(args: list, book: AddressBook) -> tuple:
         tuple: Tuple with list of phones or with message.
     """
     name, *_ = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        phones = [i.value for i in record.phones]
-        return phones, "common list"
-    else:
-        return record
+    record = book.find_or_none(name)
+    if record is None:
+        return NO_CONTACT
+    return record.phone_values(), "common list"
 
 
+@command("show-all", CONTACTS, "Display all contacts, [--page N] [--page-size M]", book="contacts", arity=0,
+         output="table", readonly=True)
 @input_error
-def show_all(book: AddressBook) -> tuple:
+def show_all(args: list, book: AddressBook) -> tuple:
     """
-    Return list of all contacts.
+    Return one page of contacts.
+
+    Only the rows of the requested page are built. Use "--page N" and
+    "--page-size M" to choose the page.
 
     Args:
+        args (list): Argument list from command line.
         book (AddressBook): Address book to save records.
 
     Returns:
-        tuple: Tuple with list of contacts or with message.
-    """
-    rows = []
-    for rec in book.values():
-        name = rec.name.value.capitalize()
-        phones = "; ".join(p.value for p in rec.phones)
-        birthday = rec.birthday.value.strftime('%d.%m.%Y') if rec.birthday else "-"
-        email = rec.email.value if rec.email else "-"
-        address = rec.address.value if rec.address else "-"
-        rows.append([name, phones, birthday, email, address])
-    return rows, "table"
-
-
+        tuple: Tuple with list of contacts and page footer or with message.
+    """
+    page, page_size = 1, PAGE_SIZE
+    options = iter(args)
+    for option in options:
+        if option == "--page":
+            page = int(next(options, ""))
+        elif option == "--page-size":
+            page_size = int(next(options, ""))
+        elif option:
+            return "Usage: show-all [--page N] [--page-size M]", "warning"
+    if page < 1 or page_size < 1:
+        return "Page and page size must be positive numbers.", "warning"
+
+    with book.lock.read():
+        total = len(book)
+        pages = max(1, -(-total // page_size))
+        start = (page - 1) * page_size
+        rows = [rec.row() for rec in book.page(start, page_size)]
+    metrics.scanned(len(rows))
+    return rows, "table", f"Page {page} of {pages} ({total} contacts)"
+
+
+@command("add-birthday", BIRTHDAY, "Add a birthday to a contact", book="contacts", arity=2)
 @input_error
 def add_birthday(args: list, book: AddressBook) -> tuple:
     """
@@ -184,14 +309,13 @@ def add_birthday(args: list, book: AddressBook) -> tuple:
         tuple: Message.
     """
     name, birthday, *_ = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        message = record.add_birthday(birthday)
-        return message
-    else:
-        return record
+    record = book.find_or_none(name)
+    if record is None:
+        return NO_CONTACT
+    return record.add_birthday(birthday)
 
 
+@command("show-birthday", BIRTHDAY, "Show a contact's birthday", book="contacts", arity=1, readonly=True)
 @input_error
 def show_birthday(args: list, book: AddressBook) -> tuple:
     """
@@ -205,32 +329,27 @@ def show_birthday(args: list, book: AddressBook) -> tuple:
         tuple: Tuple with contacts birthday or with message.
     """
     name, *_ = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        message = record.show_birthday()
-        return message if type(message) is tuple else (message, "common")
-    else:
-        return record
+    record = book.find_or_none(name)
+    if record is None:
+        return NO_CONTACT
+    return record.show_birthday()
 
 
+@command("birthdays", BIRTHDAY, "Show upcoming birthdays", book="contacts", arity=0, parser=parse_days,
+         output="table", readonly=True)
 @input_error
-def birthdays_table(book: AddressBook, days: int = 7) -> tuple:
-    data, _ = book.get_upcoming_birthdays(days)
+def birthdays_table(days: int, book: AddressBook) -> tuple:
+    rows, mtype = book.get_upcoming_birthdays(days)
 
-    if len(data) <= 1:
+    if mtype != "birthdays":
+        return rows, mtype
+    if not rows:
         return f"⚠️  No birthdays in the next {days} days.", "warning"
 
-    rows = []
-    for line in data[1:]:  # пропускаємо заголовок
-        try:
-            name, bday = line.split(": ")
-            rows.append([name.strip(), bday.strip()])
-        except ValueError:
-            continue
-
     return rows, "birthdays"
 
 
+@command("add-note", NOTES, "Add a new note", book="notes", prompts=0)
 @input_error
 def add_note(book: NoteBook):
     """
@@ -249,7 +368,7 @@ def add_note(book: NoteBook):
     if message:
         return message
     
-    if book.find_note(title):
+    if book.find_note(title) is not None:
         return "⚠️  Note with this title already exists. Change the title", "warning"
     
     text = user_input(get_prompts(text_prompt))
@@ -267,6 +386,7 @@ def add_note(book: NoteBook):
     return book.add_note(note)
 
 
+@command("find-note", NOTES, "Find a note by title", book="notes", prompts=0, readonly=True)
 @input_error
 def find_note(book: NoteBook):
     """
@@ -280,11 +400,12 @@ def find_note(book: NoteBook):
     """
     title = user_input(get_prompts(title_search_prompt))
     note = book.find_note(title)
-    if isinstance(note, Note):
-        return note.format_for_display(), "common"
-    return "⚠️  Note with this title doesn't exist.", "warning"
+    if note is None:
+        return "⚠️  Note with this title doesn't exist.", "warning"
+    return note.format_for_display(), "common"
 
 
+@command("edit-note", NOTES, "Edit the text of a note", book="notes", prompts=0)
 @input_error
 def edit_note(book: NoteBook):
     """
@@ -298,7 +419,7 @@ def edit_note(book: NoteBook):
     """
     title = user_input(get_prompts(edit_note_prompt))
     note = book.find_note(title)
-    if not note:
+    if note is None:
         return "⚠️  Note with this title doesn't exist.", "warning"
 
     new_text = user_input(get_prompts(edit_text_prompt))
@@ -315,6 +436,7 @@ def edit_note(book: NoteBook):
     return book.edit_note(title, new_text)
 
 
+@command("delete-note", NOTES, "Delete a note", book="notes", prompts=0)
 @input_error
 def delete_note(book: NoteBook):
     """
@@ -337,6 +459,7 @@ def delete_note(book: NoteBook):
     return message
 
 
+@command("show-all-notes", NOTES, "Show all notes", book="notes", readonly=True)
 @input_error
 def show_all_notes(book: NoteBook):
     """
@@ -355,11 +478,15 @@ def show_all_notes(book: NoteBook):
     return notes, "common list"
 
 
+@command("search-notes", NOTES, "Search notes by keyword", book="notes", prompts=0)
 @input_error
 def search_notes(book: NoteBook):
     """
     Search notes by keyword in title or text.
 
+    Several words separated by spaces must all match, words separated by "|"
+    match any of them. Best matches are shown first.
+
     Args:
         book (NoteBook): NoteBook to search in.
 
@@ -370,9 +497,8 @@ def search_notes(book: NoteBook):
     if not keyword.strip():
         return "⚠️  Please, enter a keyword.", "warning"
 
-    matched_notes = [note for note in book.notes
-                     if keyword.lower() in note.title.value.lower()
-                     or keyword.lower() in note.text.value.lower()]
+    mode = "or" if "|" in keyword else "and"
+    matched_notes = book.search(keyword, mode)
 
     if not matched_notes:
         return "⚠️  No matches found.", "warning"
@@ -392,6 +518,7 @@ def search_notes(book: NoteBook):
     return f"Was found {len(matched_notes)} note(s) by this keyword.", "success"
 
 
+@command("import-note", NOTES, "Import a note from file", book="notes", prompts=0)
 @input_error
 def import_note(book: NoteBook):
     """
@@ -417,6 +544,7 @@ def import_note(book: NoteBook):
     return book.add_note(note)
 
 
+@command("clear-all-notes", NOTES, "Delete all notes", book="notes")
 @input_error
 def clear_all_notes(book: NoteBook):
     """
@@ -434,6 +562,7 @@ def clear_all_notes(book: NoteBook):
     return book.clear_all_notes()
 
   
+@command("search-by-tag", NOTES, "Search notes by tag", book="notes", prompts=0, readonly=True)
 @input_error
 def search_notes_by_tag(book: NoteBook):
     """
@@ -454,6 +583,7 @@ def search_notes_by_tag(book: NoteBook):
     return [f"Notes with tag '{tag}':"] + result, "common list"
 
 
+@command("sort-by-tag", NOTES, "Sort notes by tags", book="notes", readonly=True)
 @input_error
 def sort_notes_by_tag(book: NoteBook):
     """
@@ -471,11 +601,12 @@ def sort_notes_by_tag(book: NoteBook):
     return sorted_notes, "common list"
 
 
+@command("add-tag", NOTES, "Add a tag to a note", book="notes", prompts=0)
 @input_error
 def add_tag(book: NoteBook):
     title = user_input("Enter the title of a note:\n>  ")
     note = book.find_note(title)
-    if not note:
+    if note is None:
         return "⚠️  Note with this title doesn't exist.", "warning"
     tag = user_input("Enter the 🏷️  tag to add:\n>  ")
     if not tag.strip():
@@ -484,6 +615,7 @@ def add_tag(book: NoteBook):
     return message
 
 
+@command("remove-tag", NOTES, "Remove tag from note", book="notes", prompts=0)
 @input_error
 def remove_tag(book: NoteBook):
     """
@@ -497,17 +629,18 @@ def remove_tag(book: NoteBook):
     """
     title = user_input(get_prompts(title_search_prompt))
     note = book.find_note(title)
-    if not note:
+    if note is None:
         return "⚠️  Note not found.", "warning"
     
     tag = user_input("Enter the 🏷️  tag to remove:\n>  ").strip()
     return note.remove_tag(tag)
 
 
+@command("show-tags", NOTES, "Display all unique tags used in notes", book="notes", readonly=True)
 @input_error
 def show_all_tags(book: NoteBook):
     """
-    Display a list of all unique tags across notes.
+    Display a list of all unique tags across notes with the number of notes for each.
 
     Args:
         book (NoteBook): The notebook containing the notes.
@@ -515,12 +648,13 @@ def show_all_tags(book: NoteBook):
     Returns:
         tuple: List of tags or a warning if none exist.
     """
-    tags = book.list_all_tags()
+    tags = book.tag_counts()
     if not tags:
         return "⚠️  There are no tags in your notes.", "warning"
-    return ["📌 Tags in your notes:"] + tags, "common list"
+    return ["📌 Tags in your notes:"] + [f"{tag} ({count})" for tag, count in tags.items()], "common list"
 
 
+@command("clear-all-tags", NOTES, "Remove all tags from every note", book="notes")
 @input_error
 def clear_all_tags(book:NoteBook):
     """
@@ -535,6 +669,7 @@ def clear_all_tags(book:NoteBook):
     return book.clear_all_tags()
 
 
+@command("remove-tag-from-all", NOTES, "Remove a specific tag from all notes", book="notes", prompts=0)
 @input_error
 def remove_tag_from_all(book: NoteBook):
     """
@@ -565,69 +700,253 @@ def address(args: list, book: AddressBook, func: str) -> tuple:
     Returns:
         tuple: Tuple with address or with message.
     """
-    record = book.find(args[0])
-    if type(record) is not tuple:
-        address_func = getattr(record, func)
-        return address_func(*args[1:])
-    else:
-        return record
-    
+    record = book.find_or_none(args[0])
+    if record is None:
+        return NO_CONTACT
+    address_func = getattr(record, func)
+    return address_func(*args[1:])
+
 
+register("add-address", partial(address, func="add_address"), ADDRESS, "Add an address to a contact",
+         book="contacts", arity=2)
+register("show-address", partial(address, func="show_address"), ADDRESS, "Show a contact's address",
+         book="contacts", arity=1, readonly=True)
+register("change-address", partial(address, func="edit_address"), ADDRESS, "Edit a contact's address",
+         book="contacts", arity=2)
+register("delete-address", partial(address, func="delete_address"), ADDRESS, "Delete a contact's address",
+         book="contacts", arity=1)
+
+
+@command("add-email", EMAIL, "Add an email to a contact", book="contacts", arity=2)
 @input_error
 def add_email(args, book):
     name, email = args
-    record = book.find(name)
-    if type(record) is not tuple:
-        return record.add_email(email)
-    return "⚠️  Contact not found.", "warning"
+    record = book.find_or_none(name)
+    if record is None:
+        return "⚠️  Contact not found.", "warning"
+    return record.add_email(email)
 
 
+@command("change-email", EMAIL, "Change a contact's email", book="contacts", arity=2)
 @input_error
 def edit_email(args, book):
     name, new_email = args
-    record = book.find(name)
-    if record:
-        return record.edit_email(new_email)
-    return "⚠️  Contact not found.", "warning"
+    record = book.find_or_none(name)
+    if record is None:
+        return "⚠️  Contact not found.", "warning"
+    return record.edit_email(new_email)
 
 
+@command("show-email", EMAIL, "Show a contact's email", book="contacts", arity=1, readonly=True)
 @input_error
 def show_email(args, book):
     name = args[0]
-    record = book.find(name)
-    if record:
-        return record.show_email()
-    return "⚠️  Contact not found.", "warning"
+    record = book.find_or_none(name)
+    if record is None:
+        return "⚠️  Contact not found.", "warning"
+    return record.show_email()
 
 
+@command("delete-email", EMAIL, "Delete a contact's email", book="contacts", arity=1)
 @input_error
 def delete_email(args, book):
     name = args[0]
-    record = book.find(name)
-    if record:
-        return record.delete_email()
-    return "⚠️  Contact not found.", "warning"
+    record = book.find_or_none(name)
+    if record is None:
+        return "⚠️  Contact not found.", "warning"
+    return record.delete_email()
+
+
+# Рідко вживані команди: модуль з обробником імпортується лише при першому виклику
+register("import-contacts", "bulk_commands:import_contacts", CONTACTS, "Import contacts from a .csv or .vcf file",
+         book="contacts", arity=0)
+register("export-contacts", "bulk_commands:export_contacts", CONTACTS, "Export contacts to a .csv or .vcf file",
+         book="contacts", arity=0, readonly=True)
+register("birthday-stats", "bulk_commands:birthday_stats", BIRTHDAY, "Show birthdays per month and weekday",
+         book="contacts", readonly=True)
+register("import-notes", "bulk_commands:import_notes", NOTES, "Import notes from a directory, file pattern or zip",
+         book="notes", arity=0)
+
+
+# Збереження змін з обох книг: дописуємо в журнал лише те, що змінилось
+def save_data(books, filename=DATA_FILE):
+    addressbook, notebook = books
+    journal = addressbook._journal
+    if journal is None:
+        journal = JournalStorage(filename)
+        journal.attach(addressbook, notebook)
+        journal.save_books()
+    else:
+        journal.flush()
 
 
-# Серіалізація даних в окремий файл з обох книг
-def save_data(books, filename="data/addressbook_and_notebook.pkl"):
-    # створює директорію, якщо вона не існує
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, "wb") as f:
-        pickle.dump(books, f)
+# Завантаження даних з обраного сховища (журнал або SQLite), у разі відсутності файлів повертаються порожні книги
+def load_data(filename=None, backend=None):
+    return open_storage(backend, filename).load()
 
 
-# Завантаження даних з файлу з кортежами обох книг та повернення у разі провало також обох з них
-def load_data(filename="data/addressbook_and_notebook.pkl"):
+def execute(command: list, addressbook: AddressBook, notebook: NoteBook) -> tuple:
+    """
+    Run one command.
+
+    Args:
+        command (list): Command name and its arguments.
+        addressbook (AddressBook): Address book to work with.
+        notebook (NoteBook): Notebook to work with.
+
+    Returns:
+        tuple: Result of the command handler (message, message type[, footer]).
+    """
+    cmd = commands.get(command[0])
+    if cmd is None:
+        return "Invalid command.", "error"
+    return cmd.run(command[1:], addressbook, notebook)
+
+
+def render(cmd: commands.Command, result: tuple) -> None:
+    """Print the result of a command."""
+    if cmd.output == "help":
+        show_help_table()
+    elif cmd.output == "table":
+        show_table(*result)
+    else:
+        output(*result)
+
+
+def parse_line(line: str) -> list | None:
+    """
+    Split a command line like a shell does, so arguments with spaces can be quoted.
+
+    Returns:
+        list | None: Command name and arguments, None for blank and comment lines.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
     try:
-        with open(filename, "rb") as f:
-            return pickle.load(f)
-    except FileNotFoundError:
-        return AddressBook(), NoteBook()
+        command = shlex.split(line)
+    except ValueError:
+        command = line.split()
+    command[0] = command[0].lower()
+    return command
+
+
+def run_scripted(command: list, addressbook: AddressBook, notebook: NoteBook, messages: list | None = None) -> dict:
+    """
+    Run a command without prompts and return its result as a JSON-ready dict.
+
+    Commands that normally ask questions take the answers from their arguments
+    in the order the questions are asked, e.g. ``add-note Title "Some text" y tag``.
+
+    Args:
+        command (list): Command name and its arguments.
+        addressbook (AddressBook): Address book to work with.
+        notebook (NoteBook): Notebook to work with.
+        messages (list | None): List to collect messages printed by the command.
+
+    Returns:
+        dict: Command name, status (message type), result and optional footer.
+    """
+    cmd = commands.get(command[0])
+    set_script_answers(cmd.answers(command[1:]) if cmd else [], messages)
+    with metrics.measure(cmd.name if cmd else "(unknown)") as sample:
+        result = execute(command, addressbook, notebook)
+        sample.status = result[1]
+        sample.phase("handler")
+    report = {"command": command[0], "status": result[1], "result": result[0]}
+    if len(result) > 2:
+        report["footer"] = result[2]
+    return report
+
+
+def run_batch(source, addressbook: AddressBook, notebook: NoteBook) -> None:
+    """
+    Run commands from a file or stdin, one per line, and print one JSON object per command.
+
+    A command that raises is reported with status "error" and the batch goes on.
+
+    Args:
+        source: File object with commands.
+        addressbook (AddressBook): Address book to work with.
+        notebook (NoteBook): Notebook to work with.
+    """
+    for line_number, line in enumerate(source, start=1):
+        command = parse_line(line)
+        if command is None:
+            continue
+        cmd = commands.get(command[0])
+        if cmd is not None and cmd.output == "exit":
+            break
+        try:
+            report = {"line": line_number, **run_scripted(command, addressbook, notebook)}
+        except Exception as e:
+            report = {"line": line_number, "command": command[0], "status": "error",
+                      "result": f"{type(e).__name__}: {e}"}
+        print(json.dumps(report, ensure_ascii=False, default=str), flush=True)
+
+
+# Модулі, які завантажуються лише при першому використанні
+DEFERRED_MODULES = ["prompt_toolkit", "prettytable", "colorama", "pickle", "sqlite3", "calendar", "numpy"]
+
+
+def parse_args(argv: list) -> SimpleNamespace:
+    """Parse the command line; argparse is imported only if there are arguments."""
+    if not argv:
+        return SimpleNamespace(batch=None, profile_startup=False, metrics=None)
+    import argparse
+    parser = argparse.ArgumentParser(description="Address book and notes assistant.")
+    parser.add_argument("--batch", metavar="FILE", help="run commands from FILE ('-' for stdin) and exit")
+    parser.add_argument("--profile-startup", action="store_true", help="report where the startup time goes")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time book methods and validators as well and write the statistics to FILE at exit")
+    return parser.parse_args(argv)
+
+
+def startup_report(phases: list) -> None:
+    """
+    Print startup timings to stderr.
+
+    Args:
+        phases (list): (phase name, seconds) pairs.
+    """
+    # process_time() рахує час процесу від запуску інтерпретатора, включно з імпортами
+    lines = [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in phases]
+    lines.append("loaded on demand: " + ", ".join(
+        f"{name} {'yes' if name in sys.modules else 'no'}" for name in DEFERRED_MODULES))
+    lines.append("per-module import times: python -X importtime assistant.py ...")
+    print("\n".join(lines), file=sys.stderr)
 
 
 def main():
+    phases = [("interpreter and imports (CPU)", time.process_time())]
+    options = parse_args(sys.argv[1:])
+    if options.metrics:
+        metrics.enable()
+
+    start = time.perf_counter()
     addressbook, notebook = load_data()
+    phases.append(("load data", time.perf_counter() - start))
+    if options.batch:
+        start = time.perf_counter()
+        try:
+            if options.batch == "-":
+                run_batch(sys.stdin, addressbook, notebook)
+            else:
+                with open(options.batch, "r", encoding="utf-8") as f:
+                    run_batch(f, addressbook, notebook)
+        finally:
+            # зміни виконаних команд зберігаються, навіть якщо пакет перервано
+            save_data((addressbook, notebook))
+            addressbook._journal.sync()
+        phases.append(("commands and save", time.perf_counter() - start))
+        if options.profile_startup:
+            startup_report(phases)
+        if options.metrics:
+            metrics.dump(options.metrics)
+        return
+
+    if options.profile_startup:
+        startup_report(phases)
     user_output("Welcome to the assistant bot!")
     while True:
         command = main_user_input()
@@ -635,87 +954,24 @@ def main():
             continue
         command[0] = command[0].lower()
 
-        match command[0]:
-            case 'exit' | 'close':
-                user_output("Good bye!")
-                break
-            case 'hello':
-                user_output("How can I help you?")
-            case 'add-contact':
-                output(*add_contact(command[1:], addressbook))
-            case 'change-contact':
-                output(*change_contact(command[1:], addressbook))
-            case 'find-contact':
-                show_table(*find_contact(command[1:], addressbook))
-            case 'show-phone':
-                output(*show_phone(command[1:], addressbook))
-            case 'delete-contact':
-                output(*delete_contact(command[1:], addressbook))
-            case 'add-address':
-                output(*address(command[1:], addressbook, "add_address"))
-            case 'show-address':
-                output(*address(command[1:], addressbook, "show_address"))
-            case 'change-address':
-                output(*address(command[1:], addressbook, "edit_address"))
-            case 'delete-address':
-                output(*address(command[1:], addressbook, "delete_address"))
-            case 'add-email':
-                output(*add_email(command[1:], addressbook))
-            case 'change-email':
-                output(*edit_email(command[1:], addressbook))
-            case 'show-email':
-                output(*show_email(command[1:], addressbook))
-            case 'delete-email':
-                output(*delete_email(command[1:], addressbook))
-            case 'add-birthday':
-                output(*add_birthday(command[1:], addressbook))
-            case 'show-birthday':
-                output(*show_birthday(command[1:], addressbook))
-            case 'birthdays':
-                try:
-                    days = int(command[1])
-                except IndexError:
-                    days = 7
-                show_table(*birthdays_table(addressbook, days))
-            case 'clear-all-contacts':
-                output(*clear_all_contacts(addressbook))
-            case 'add-note':
-                output(*add_note(notebook))
-            case 'find-note':
-                output(*find_note(notebook))
-            case 'edit-note':
-                output(*edit_note(notebook))
-            case 'delete-note':
-                output(*delete_note(notebook))
-            case 'show-all-notes':
-                output(*show_all_notes(notebook))
-            case 'search-notes':
-                output(*search_notes(notebook))
-            case 'import-note':
-                output(*import_note(notebook))
-            case 'clear-all-notes':
-                output(*clear_all_notes(notebook))
-            case 'search-by-tag':
-                output(*search_notes_by_tag(notebook))
-            case 'sort-by-tag':
-                output(*sort_notes_by_tag(notebook))
-            case 'add-tag':
-                output(*add_tag(notebook))
-            case 'remove-tag':
-                output(*remove_tag(notebook))
-            case 'show-tags':
-                output(*show_all_tags(notebook))
-            case 'clear-all-tags':
-                output(*clear_all_tags(notebook))
-            case 'remove-tag-from-all':
-                output(*remove_tag_from_all(notebook))
-            case 'help':
-                show_help_table()
-            case 'show-all':
-                show_table(*show_all(addressbook))
-            case _:
-                output("Invalid command.", "error")
-    save_data((addressbook, notebook))
+        cmd = commands.get(command[0])
+        if cmd is None:
+            output("Invalid command.", "error")
+            continue
+        with metrics.measure(cmd.name) as sample:
+            result = cmd.run(command[1:], addressbook, notebook)
+            sample.status = result[1]
+            sample.phase("handler")
+            render(cmd, result)
+            sample.phase("render")
+            if cmd.output != "exit":
+                save_data((addressbook, notebook))
+                sample.phase("save")
+        if cmd.output == "exit":
+            break
+    addressbook._journal.close()
+    if options.metrics:
+        metrics.dump(options.metrics)
 
 
 if __name__ == '__main__':
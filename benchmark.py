@@ -0,0 +1,284 @@
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import date
+
+from record import AddressBook, NoteBook, Record, Note
+from assistant import show_all, save_data, load_data
+from tableview import show_table
+
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+FIRST_NAMES = ["olena", "andrii", "maria", "taras", "iryna", "oleksandr", "sofiia", "dmytro", "anna", "bohdan",
+               "kateryna", "yurii", "natalia", "serhii", "oksana", "vasyl", "daryna", "petro", "halyna", "maksym"]
+DOMAINS = ["gmail.com", "ukr.net", "i.ua", "outlook.com", "proton.me"]
+STREETS = ["Shevchenka", "Franka", "Khreshchatyk", "Sadova", "Lvivska", "Naukova", "Zelena"]
+SYLLABLES = ["ka", "ro", "mi", "ten", "sa", "lo", "vi", "dar", "ne", "po", "shu", "ra", "bel", "to", "gi", "zo"]
+TAGS = [f"tag{i}" for i in range(50)]
+
+
+def _letters(n: int) -> str:
+    """Encode a number with letters only, so generated names pass Name validation."""
+    letters = ""
+    while True:
+        n, rest = divmod(n, 26)
+        letters += chr(ord("a") + rest)
+        if n == 0:
+            return letters
+
+
+def make_contacts(count: int, seed: int = 0) -> list:
+    """
+    Generate contacts with unique names, 1-2 phones, a birthday and an email, most with an address.
+
+    Args:
+        count (int): Number of contacts.
+        seed (int): Seed of the random generator, the same seed gives the same data.
+
+    Returns:
+        list: Record objects.
+    """
+    rng = random.Random(seed)
+    first_day = date(1950, 1, 1).toordinal()
+    records = []
+    for i in range(count):
+        name = FIRST_NAMES[i % len(FIRST_NAMES)] + _letters(i // len(FIRST_NAMES))
+        record = Record(name)
+        for _ in range(rng.randint(1, 2)):
+            record.add_phone(f"0{rng.randrange(10 ** 9):09d}")
+        birthday = date.fromordinal(first_day + rng.randrange(60 * 365))
+        record.add_birthday(birthday.strftime("%d.%m.%Y"))
+        record.add_email(f"{name}@{rng.choice(DOMAINS)}")
+        if rng.random() < 0.7:
+            record.add_address(str(rng.randint(1, 200)), rng.choice(STREETS), "St")
+        records.append(record)
+    return records
+
+
+def make_vocabulary(size: int, seed: int = 0) -> list:
+    """Generate distinct words built from syllables."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_notes(count: int, seed: int = 0) -> tuple:
+    """
+    Generate notes with unique titles, 10-40 word bodies and 0-3 tags.
+
+    Words follow a Zipf-like distribution, so some of them are in most notes
+    and most of them are rare, as in real text.
+
+    Args:
+        count (int): Number of notes.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: Note objects and the vocabulary they were written with.
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(2000, seed)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    notes = []
+    for i in range(count):
+        note = Note()
+        note.add_title(f"note{i}")
+        note.add_text(" ".join(rng.choices(vocabulary, weights, k=rng.randint(10, 40))))
+        for tag in rng.sample(TAGS, rng.randint(0, 3)):
+            note.add_tag(tag)
+        notes.append(note)
+    return notes, vocabulary
+
+
+def measure(func, args_list: list) -> dict:
+    """
+    Call the function once for every argument tuple and summarize the timings.
+
+    Peak memory is taken from a separate traced call, so tracing does not
+    slow down the timed calls.
+
+    Args:
+        func: Function to benchmark.
+        args_list (list): Argument tuples, one per call.
+
+    Returns:
+        dict: Number of calls, throughput, latency percentiles in ms and peak memory in KiB.
+    """
+    tracemalloc.start()
+    func(*args_list[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    clock = time.perf_counter
+    for args in args_list:
+        start = clock()
+        func(*args)
+        timings.append(clock() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "calls": len(timings),
+        "total_s": round(total, 6),
+        "ops_per_s": round(len(timings) / total, 1) if total else None,
+        "p50_ms": _ms(_percentile(timings, 50)),
+        "p90_ms": _ms(_percentile(timings, 90)),
+        "p99_ms": _ms(_percentile(timings, 99)),
+        "max_ms": _ms(timings[-1]),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _percentile(values: list, percent: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 4)
+
+
+def _render_contacts(book: AddressBook) -> None:
+    with redirect_stdout(io.StringIO()):
+        show_table(*show_all([], book))
+
+
+def _save(addressbook: AddressBook, notebook: NoteBook, filename: str) -> None:
+    # без журналу save_data записує повний знімок, як при першому збереженні
+    addressbook._journal = notebook._journal = None
+    save_data((addressbook, notebook), filename)
+
+
+def _load(filename: str) -> None:
+    # книги лише читаються: журнал порожній, закривати сховище нема чого
+    load_data(filename, "journal")
+
+
+def _load_and_scan(filename: str) -> None:
+    addressbook, notebook = load_data(filename, "journal")
+    addressbook.find_by_keyword("-")
+    notebook.list_all_tags()
+
+
+def run(size: str, repeat: int = 1000, scan_repeat: int = 5, seed: int = 0) -> dict:
+    """
+    Build books of the given size and benchmark their hot paths.
+
+    Args:
+        size (str): One of SIZES.
+        repeat (int): Number of calls of single lookups.
+        scan_repeat (int): Number of calls of operations that go over many records.
+        seed (int): Seed of the data and query generators.
+
+    Returns:
+        dict: Benchmark results by operation.
+    """
+    count = SIZES[size]
+    rng = random.Random(seed + 1)
+    results = {}
+
+    start = time.perf_counter()
+    records = make_contacts(count, seed)
+    notes, vocabulary = make_notes(count, seed)
+    addressbook, notebook = AddressBook(), NoteBook()
+    addressbook.add_records(records)
+    notebook.add_notes(notes)
+    results["build"] = {"contacts": len(addressbook), "notes": len(notebook.notes),
+                        "total_s": round(time.perf_counter() - start, 3)}
+
+    sample = rng.choices(records, k=repeat)
+    missing = [(f"missing{_letters(i)}",) for i in range(repeat)]
+    words = vocabulary[len(vocabulary) // 10:]
+    lookups = {
+        "find_or_none": (addressbook.find_or_none, [(r.name.value,) for r in sample]),
+        "find_or_none (miss)": (addressbook.find_or_none, missing),
+        "find_by_keyword (phone)": (addressbook.find_by_keyword, [(r.phone_values()[0],) for r in sample]),
+        "find_by_keyword (email)": (addressbook.find_by_keyword, [(r.email.value,) for r in sample]),
+        "find_note": (notebook.find_note, [(f"note{rng.randrange(count)}",) for _ in range(repeat)]),
+        "find_note (miss)": (notebook.find_note, missing),
+    }
+    scans = {
+        "get_upcoming_birthdays": (addressbook.get_upcoming_birthdays, [(7,)] * scan_repeat),
+        "search_notes": (notebook.search_notes, [(rng.choice(words),) for _ in range(scan_repeat)]),
+        "search_by_tag": (notebook.search_by_tag, [(rng.choice(TAGS),) for _ in range(scan_repeat)]),
+        "sort_by_tag": (notebook.sort_by_tag, [()] * scan_repeat),
+        "show_all_notes": (notebook.show_all_notes, [()] * scan_repeat),
+        "show_all (render)": (_render_contacts, [(addressbook,)] * scan_repeat),
+    }
+    for name, (func, args_list) in (lookups | scans).items():
+        results[name] = measure(func, args_list)
+        print(f"{size} {name}: {results[name]['p50_ms']} ms p50", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "books.pkl")
+        persistence = {
+            "save_data": (_save, [(addressbook, notebook, filename)] * scan_repeat),
+            "load_data": (_load, [(filename,)] * scan_repeat),
+            "load_data + first scan": (_load_and_scan, [(filename,)] * scan_repeat),
+        }
+        for name, (func, args_list) in persistence.items():
+            results[name] = measure(func, args_list)
+            print(f"{size} {name}: {results[name]['p50_ms']} ms p50", file=sys.stderr)
+        results["save_data"]["file_kib"] = round(os.path.getsize(filename) / 1024, 1)
+        addressbook._journal.close()
+    return results
+
+
+def environment() -> dict:
+    """Describe the machine and the code version the results were taken on."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the address book, notebook and persistence.")
+    parser.add_argument("--size", default="1k",
+                        help=f"comma-separated data sizes: {', '.join(SIZES)} (default 1k)")
+    parser.add_argument("--repeat", type=int, default=1000, help="calls of every single lookup (default 1000)")
+    parser.add_argument("--scan-repeat", type=int, default=5,
+                        help="calls of every operation over many records and of save/load (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated data (default 0)")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report to FILE instead of stdout")
+    options = parser.parse_args()
+
+    sizes = options.size.lower().split(",")
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size: {', '.join(unknown)}")
+    report = {
+        "environment": environment(),
+        "options": {"repeat": options.repeat, "scan_repeat": options.scan_repeat, "seed": options.seed},
+        "results": {size: run(size, options.repeat, options.scan_repeat, options.seed) for size in sizes},
+    }
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
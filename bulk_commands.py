@@ -0,0 +1,105 @@
+import os
+
+import analytics
+import contacts_io
+import notes_io
+from record import AddressBook, NoteBook
+from ui_helpers import output
+from utils import input_error
+
+
+@input_error
+def import_contacts(args: list, book: AddressBook) -> tuple:
+    """
+    Import contacts from a CSV or vCard file without prompts.
+
+    Args:
+        args (list): Argument list from command line.
+        book (AddressBook): Address book to save records.
+
+    Returns:
+        tuple: Summary message.
+    """
+    path = " ".join(args).strip()
+    if not os.path.isfile(path):
+        return "File not found.", "error"
+    if contacts_io.contacts_format(path) is None:
+        return contacts_io.unsupported_format(path), "error"
+    result = contacts_io.import_contacts(book, path)
+    if result["error"] and not result["imported"]:
+        return result["error"], "error"
+    if result["error"]:
+        result["errors"].append(result["error"])
+    if result["errors"]:
+        output(["Failed rows:"] + result["errors"], "common list")
+    return (f"Imported {result['imported']} contact(s), failed {result['failed']} "
+            f"in {result['seconds']:.2f}s.", "success")
+
+
+@input_error
+def export_contacts(args: list, book: AddressBook) -> tuple:
+    """
+    Export all contacts to a CSV or vCard file.
+
+    Args:
+        args (list): Argument list from command line.
+        book (AddressBook): Address book to export.
+
+    Returns:
+        tuple: Summary message.
+    """
+    path = " ".join(args).strip()
+    if not path:
+        return "Enter a file name (.csv or .vcf).", "warning"
+    result = contacts_io.export_contacts(book, path)
+    if result["error"]:
+        return result["error"], "error"
+    return f"Exported {result['exported']} contact(s) to {path} in {result['seconds']:.2f}s.", "success"
+
+
+@input_error
+def birthday_stats(book: AddressBook) -> tuple:
+    """
+    Show how many birthdays fall on every month and weekday.
+
+    Args:
+        book (AddressBook): Address book to save records.
+
+    Returns:
+        tuple: List of statistic lines or a warning.
+    """
+    if analytics.np is None:
+        return "⚠️  Install NumPy to see birthday statistics.", "warning"
+    cols = analytics.columns(book)
+    lines = ["🎂 Birthdays per month:"]
+    lines += [f"{month}: {count}" for month, count in cols.birthdays_per_month().items()]
+    lines.append("📅 Birthdays per weekday this year:")
+    lines += [f"{day}: {count}" for day, count in cols.birthdays_per_weekday().items()]
+    return lines, "common list"
+
+
+@input_error
+def import_notes(args: list, book: NoteBook):
+    """
+    Import all text files from a directory, glob pattern or zip archive.
+
+    Args:
+        args (list): Argument list from command line.
+        book (NoteBook): NoteBook to add the imported notes to.
+
+    Returns:
+        tuple: Summary message.
+    """
+    path = " ".join(args).strip()
+    if not path:
+        return "Enter a directory, file pattern or zip archive.", "warning"
+
+    result = notes_io.import_notes(book, path)
+    if result["errors"]:
+        output(["Failed files:"] + result["errors"][:10], "common list")
+    total = result["imported"] + result["skipped"] + result["failed"]
+    if total == 0:
+        return "No text files found.", "warning"
+    rate = total / result["seconds"] if result["seconds"] else total
+    return (f"Imported {result['imported']} note(s), skipped {result['skipped']} existing, "
+            f"failed {result['failed']} in {result['seconds']:.2f}s ({rate:.0f} files/s).", "success")
@@ -0,0 +1,129 @@
+import importlib
+
+
+GENERAL = "🤖 GENERAL"
+CONTACTS = "📞 CONTACTS"
+ADDRESS = "🏠 ADDRESS"
+EMAIL = "✉️   EMAIL"
+BIRTHDAY = "🎂 BIRTHDAY"
+NOTES = "📝 NOTES"
+SECTIONS = [GENERAL, CONTACTS, ADDRESS, EMAIL, BIRTHDAY, NOTES]
+
+_commands = {}
+
+
+class Command:
+    """
+    Registered command: handler and everything needed to call and describe it.
+
+    The handler can be given as "module:function" and is imported on first use.
+    """
+
+    __slots__ = ("name", "aliases", "section", "help", "book", "arity", "parser", "output", "prompts", "readonly",
+                 "_handler")
+
+    def __init__(self, name: str, handler, section: str, help: str, book: str | None = None,
+                 arity: int | None = None, parser=None, output: str = "message", prompts: int | None = None,
+                 readonly: bool = False, aliases: tuple = ()):
+        self.name = name
+        self.aliases = aliases
+        self.section = section
+        self.help = help
+        self.book = book
+        self.arity = arity
+        self.parser = parser
+        self.output = output
+        self.prompts = prompts
+        self.readonly = readonly
+        self._handler = handler
+
+    @property
+    def handler(self):
+        if isinstance(self._handler, str):
+            module, _, attr = self._handler.partition(":")
+            self._handler = getattr(importlib.import_module(module), attr)
+        return self._handler
+
+    def run(self, args: list, addressbook, notebook) -> tuple:
+        """
+        Call the handler with the command line arguments.
+
+        Args:
+            args (list): Arguments after the command name.
+            addressbook (AddressBook): Address book for contact commands.
+            notebook (NoteBook): Notebook for note commands.
+
+        Returns:
+            tuple: Result of the handler (message, message type[, footer]).
+        """
+        call_args = []
+        if self.arity is not None:
+            if len(args) < self.arity:
+                return "Invalid command.", "error"
+            if self.parser is not None:
+                try:
+                    args = self.parser(args)
+                except ValueError as e:
+                    return str(e), "error"
+            call_args.append(args)
+        if self.book == "contacts":
+            call_args.append(addressbook)
+        elif self.book == "notes":
+            call_args.append(notebook)
+        return self.handler(*call_args)
+
+    def answers(self, args: list) -> list:
+        """Return the arguments that answer the questions of the command."""
+        return [] if self.prompts is None else args[self.prompts:]
+
+
+def register(name: str, handler, section: str, help: str, **options) -> Command:
+    """
+    Register a command handler.
+
+    Args:
+        name (str): Command name typed by the user.
+        handler: Function or "module:function" to import lazily.
+        section (str): Help section, one of SECTIONS.
+        help (str): Description shown by the "help" command.
+        **options: book ("contacts" or "notes") passed to the handler, arity (minimum
+            number of arguments, None if the handler takes no arguments), parser for
+            the argument list, output ("message", "table", "help" or "exit"), prompts
+            (index of the first argument used to answer questions in batch mode), readonly
+            (the command does not change the books and may run next to other readers), aliases.
+
+    Returns:
+        Command: Registered command.
+    """
+    cmd = Command(name, handler, section, help, **options)
+    for key in (name, *cmd.aliases):
+        _commands[key] = cmd
+    return cmd
+
+
+def command(name: str, section: str, help: str, **options):
+    """Decorator form of register()."""
+    def decorator(func):
+        register(name, func, section, help, **options)
+        return func
+    return decorator
+
+
+def get(name: str) -> Command | None:
+    return _commands.get(name)
+
+
+def names() -> list:
+    """Return all command names including aliases."""
+    return list(_commands)
+
+
+def help_sections() -> dict:
+    """Return (names, help) rows of every section in registration order."""
+    sections = {section: [] for section in SECTIONS}
+    seen = set()
+    for cmd in _commands.values():
+        if cmd.name not in seen:
+            seen.add(cmd.name)
+            sections.setdefault(cmd.section, []).append((" / ".join((cmd.name, *cmd.aliases)), cmd.help))
+    return sections
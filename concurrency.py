@@ -0,0 +1,117 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+class RWLock:
+    """
+    Reader/writer lock for threads.
+
+    Any number of threads can read together, a writer holds the lock alone.
+    Both sides are reentrant and the writer may also read, but a reader cannot
+    upgrade to a writer. Waiting writers block new readers, so a stream of
+    reads cannot starve them.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            reads = getattr(self._local, "reads", 0)
+            if reads == 0:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+            self._local.reads = reads + 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._depth -= 1
+                return
+            self._local.reads -= 1
+            if self._local.reads == 0:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            if getattr(self._local, "reads", 0):
+                raise RuntimeError("A read lock cannot be upgraded to a write lock.")
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._depth -= 1
+            if self._depth == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class NoLock:
+    """Lock of books used by a single thread: taking it costs nothing."""
+
+    _context = nullcontext()
+
+    def read(self):
+        return self._context
+
+    def write(self):
+        return self._context
+
+
+NO_LOCK = NoLock()
+
+
+def read_locked(method):
+    """Run the method under the read side of ``self.lock``."""
+    @wraps(method)
+    def inner(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return inner
+
+
+def write_locked(method):
+    """Run the method under the write side of ``self.lock``."""
+    @wraps(method)
+    def inner(self, *args, **kwargs):
+        with self.lock.write():
+            return method(self, *args, **kwargs)
+    return inner
@@ -0,0 +1,292 @@
+import csv
+import os
+import re
+import time
+from itertools import islice
+
+from models import Name, Phone, Birthday, Email, Address
+from record import AddressBook, Record
+
+
+CSV_FIELDS = ["name", "phones", "birthday", "email", "address"]
+BATCH_SIZE = 1000
+MAX_ERRORS = 10
+
+
+def contacts_format(path: str) -> str | None:
+    """Guess the file format by its extension: "csv", "vcard" or None if unsupported."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".vcf", ".vcard"):
+        return "vcard"
+    if ext == ".csv":
+        return "csv"
+    return None
+
+
+def unsupported_format(path: str) -> str:
+    """Message for a file whose extension is neither .csv nor .vcf."""
+    ext = os.path.splitext(path)[1] or "no extension"
+    return f"Unsupported file format ({ext}). Use .csv or .vcf."
+
+
+def _os_error(action: str, path: str, error: OSError) -> str:
+    return f"Cannot {action} {path}: {error.strerror or error}."
+
+
+def read_csv(f):
+    """Yield contact rows from a CSV file with a header line."""
+    reader = csv.DictReader(f)
+    line = 2
+    for row in reader:
+        yield {
+            "line": line,
+            "name": (row.get("name") or "").strip(),
+            "phones": [p.strip() for p in (row.get("phones") or "").split(";") if p.strip()],
+            "birthday": (row.get("birthday") or "").strip(),
+            "email": (row.get("email") or "").strip(),
+            "address": (row.get("address") or "").strip(),
+        }
+        # значення в лапках можуть займати кілька рядків файлу
+        line = reader.line_num + 1
+
+
+def read_vcard(f):
+    """Yield contact rows from a vCard file, each with the line its BEGIN is on."""
+    row = None
+    for number, line in _unfold(f):
+        key, _, value = line.partition(":")
+        key = key.split(";")[0].upper()
+        if key == "BEGIN":
+            row = {"line": number, "name": "", "phones": [], "birthday": "", "email": "", "address": ""}
+        elif row is None:
+            continue
+        elif key == "END":
+            yield row
+            row = None
+        elif key == "FN":
+            row["name"] = _vcard_unescape(value).strip()
+        elif key == "TEL":
+            row["phones"].append(_vcard_unescape(value).strip())
+        elif key == "BDAY":
+            row["birthday"] = _vcard_to_birthday(value.strip())
+        elif key == "EMAIL":
+            row["email"] = _vcard_unescape(value).strip()
+        elif key == "ADR":
+            row["address"] = " ".join(part for part in _vcard_components(value) if part).strip()
+
+
+def _unfold(f):
+    """Yield (line number, logical line) pairs, joining folded continuation lines (RFC 6350, 3.2)."""
+    current, start = None, 0
+    for number, line in enumerate(f, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield start, current
+        current, start = line, number
+    if current:
+        yield start, current
+
+
+_VCARD_ESCAPE = re.compile(r"\\(.)")
+_VCARD_UNESCAPED = {"n": "\n", "N": "\n"}
+
+
+def _vcard_escape(value: str) -> str:
+    """Escape a text value for vCard (RFC 6350, 3.4)."""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _vcard_unescape(value: str) -> str:
+    return _VCARD_ESCAPE.sub(lambda m: _VCARD_UNESCAPED.get(m.group(1), m.group(1)), value)
+
+
+def _vcard_components(value: str) -> list:
+    """Split a structured value (ADR) on the semicolons that are not escaped and unescape the parts."""
+    parts, current, chars = [], "", iter(value)
+    for char in chars:
+        if char == "\\":
+            current += char + next(chars, "")
+        elif char == ";":
+            parts.append(_vcard_unescape(current))
+            current = ""
+        else:
+            current += char
+    parts.append(_vcard_unescape(current))
+    return parts
+
+
+def _vcard_to_birthday(value: str) -> str:
+    # vCard зберігає дату як YYYY-MM-DD або YYYYMMDD
+    digits = value.replace("-", "")
+    if len(digits) == 8 and digits.isdigit():
+        return f"{digits[6:8]}.{digits[4:6]}.{digits[:4]}"
+    return value
+
+
+def build_records(rows, batch_size: int = BATCH_SIZE):
+    """
+    Validate rows and turn them into records.
+
+    Every column of a batch of rows is validated at once with
+    Field.validate_many, and records are built from the normalized values.
+
+    Yields:
+        tuple: Record or None and an error message or None.
+    """
+    for batch in batched(rows, batch_size):
+        names, _ = Name.validate_many([row["name"] for row in batch])
+        phones = [phone for row in batch for phone in row["phones"]]
+        valid_phones, _ = Phone.validate_many(phones)
+        birthdays = _validate_optional(Birthday, [row["birthday"] for row in batch])
+        emails = _validate_optional(Email, [row["email"] for row in batch])
+        addresses = _validate_optional(Address, [row["address"] for row in batch])
+
+        first_phone = 0
+        for i, row in enumerate(batch):
+            line = row["line"]
+            row_phones = valid_phones[first_phone:first_phone + len(row["phones"])]
+            first_phone += len(row["phones"])
+            if names[i] is None:
+                yield None, f"line {line}: invalid name '{row['name']}'"
+            elif None in row_phones:
+                yield None, f"line {line}: invalid phone '{row['phones'][row_phones.index(None)]}'"
+            elif birthdays[i] is None:
+                yield None, f"line {line}: invalid birthday '{row['birthday']}'"
+            elif emails[i] is None:
+                yield None, f"line {line}: invalid email '{row['email']}'"
+            elif addresses[i] is None:
+                yield None, f"line {line}: invalid address '{row['address']}'"
+            else:
+                yield Record.from_normalized(names[i], row_phones, birthdays[i] or None, emails[i] or None,
+                                             addresses[i] or None), None
+
+
+def _validate_optional(field, values: list) -> list:
+    """Validate the non-empty values; empty ones stay "" and invalid ones become None."""
+    filled = [i for i, value in enumerate(values) if value]
+    normalized, _ = field.validate_many([values[i] for i in filled])
+    result = [""] * len(values)
+    for i, value in zip(filled, normalized):
+        result[i] = value
+    return result
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_contacts(book: AddressBook, path: str, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Import contacts from a CSV or vCard file.
+
+    Rows are streamed, validated and added in batches; a contact with an
+    existing name is replaced.
+
+    Args:
+        book (AddressBook): AddressBook to add the contacts to.
+        path (str): CSV or vCard file.
+        batch_size (int): Number of records added at once.
+
+    Returns:
+        dict: Numbers of imported and failed rows, first errors and elapsed time;
+            "error" holds a message if the file could not be read at all.
+    """
+    start = time.perf_counter()
+    imported, failed, errors = 0, 0, []
+    result = {"imported": imported, "failed": failed, "errors": errors, "error": None}
+    fmt = contacts_format(path)
+    if fmt is None:
+        result["error"] = unsupported_format(path)
+        return result | {"seconds": time.perf_counter() - start}
+    reader = read_vcard if fmt == "vcard" else read_csv
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for batch in batched(build_records(reader(f)), batch_size):
+                records = []
+                for record, error in batch:
+                    if record is None:
+                        failed += 1
+                        if len(errors) < MAX_ERRORS:
+                            errors.append(error)
+                    else:
+                        records.append(record)
+                added = book.add_records(records)
+                imported += added
+                if added < len(records):
+                    # з унікальними телефонами записи з чужими номерами пропускаються
+                    failed += len(records) - added
+                    if len(errors) < MAX_ERRORS:
+                        errors.append(f"{len(records) - added} contact(s) with phones of other contacts skipped")
+    except OSError as e:
+        # вже додані пакети лишаються в книзі, про решту повідомляємо
+        result["error"] = _os_error("read", path, e)
+    except UnicodeDecodeError:
+        result["error"] = f"Cannot read {path}: the file is not UTF-8 text."
+    result.update(imported=imported, failed=failed)
+    return result | {"seconds": time.perf_counter() - start}
+
+
+def write_csv(f, records) -> int:
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for record in records:
+        writer.writerow([
+            record.name.value,
+            ";".join(record.phone_values()),
+            record.birthday.value.strftime("%d.%m.%Y") if record.birthday else "",
+            record.email.value if record.email else "",
+            record.address.value if record.address else "",
+        ])
+        count += 1
+    return count
+
+
+def write_vcard(f, records) -> int:
+    count = 0
+    for record in records:
+        lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{_vcard_escape(record.name.value)}"]
+        lines += [f"TEL:{phone}" for phone in record.phone_values()]
+        if record.birthday:
+            lines.append(f"BDAY:{record.birthday.value.isoformat()}")
+        if record.email:
+            lines.append(f"EMAIL:{_vcard_escape(record.email.value)}")
+        if record.address:
+            lines.append(f"ADR:;;{_vcard_escape(record.address.value)};;;;")
+        lines.append("END:VCARD")
+        f.write("\r\n".join(lines) + "\r\n")
+        count += 1
+    return count
+
+
+def export_contacts(book: AddressBook, path: str) -> dict:
+    """
+    Export all contacts to a CSV or vCard file.
+
+    Args:
+        book (AddressBook): AddressBook to export.
+        path (str): CSV or vCard file.
+
+    Returns:
+        dict: Number of exported contacts and elapsed time;
+            "error" holds a message if the file could not be written.
+    """
+    start = time.perf_counter()
+    fmt = contacts_format(path)
+    if fmt is None:
+        return {"exported": 0, "error": unsupported_format(path), "seconds": time.perf_counter() - start}
+    writer = write_vcard if fmt == "vcard" else write_csv
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f, book.lock.read():
+            exported = writer(f, book.values())
+    except OSError as e:
+        return {"exported": 0, "error": _os_error("write", path, e), "seconds": time.perf_counter() - start}
+    return {"exported": exported, "error": None, "seconds": time.perf_counter() - start}
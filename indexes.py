@@ -0,0 +1,466 @@
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+from math import log
+
+
+class KeywordIndex:
+    """
+    Inverted index from a keyword to the keys of the objects that have it.
+
+    Keys are kept in insertion order, so results come out in the same order
+    as the objects were indexed. Most keywords (phones, emails) belong to a
+    single object, so such a keyword maps straight to its key and only gets a
+    dict once a second object shares it.
+
+    Prefix and approximate lookups use a sorted keyword list and a trigram
+    index that are built on their first use and kept up to date afterwards.
+    """
+
+    def __init__(self):
+        self._keys = {}
+        self._keywords = {}
+        self._sorted = None
+        self._trigrams = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, key, keywords) -> None:
+        """
+        Replace the keywords of an object.
+
+        Args:
+            key: Key of the object (e.g. contact name).
+            keywords: Iterable with the new keywords.
+        """
+        new = tuple(dict.fromkeys(keywords))
+        old = self._keywords.get(key, ())
+        if old == new:
+            return
+        for keyword in set(old).difference(new):
+            self._discard(keyword, key)
+        for keyword in set(new).difference(old):
+            self._add(keyword, key)
+        self._keywords[key] = new
+
+    def remove(self, key) -> None:
+        """Remove an object from the index."""
+        for keyword in self._keywords.pop(key, ()):
+            self._discard(keyword, key)
+
+    def get(self, keyword) -> list:
+        """Return keys of the objects that have the keyword."""
+        keys = self._keys.get(keyword)
+        if keys is None:
+            return []
+        return list(keys) if type(keys) is dict else [keys]
+
+    def count(self, keyword) -> int:
+        """Return the number of objects that have the keyword."""
+        keys = self._keys.get(keyword)
+        if keys is None:
+            return 0
+        return len(keys) if type(keys) is dict else 1
+
+    def keywords(self) -> list:
+        """Return all indexed keywords."""
+        return list(self._keys)
+
+    def startswith(self, prefix: str, limit: int | None = None) -> list:
+        """
+        Return keys of the objects that have a keyword starting with the prefix.
+
+        Keywords are visited in alphabetical order, so an exact match comes first.
+
+        Args:
+            prefix (str): Beginning of the keyword.
+            limit (int | None): Maximum number of keys.
+
+        Returns:
+            list: Keys of the matching objects.
+        """
+        keywords = self._sorted
+        if keywords is None:
+            keywords = self._sorted = sorted(self._keys)
+        found = {}
+        for i in range(bisect_left(keywords, prefix), len(keywords)):
+            keyword = keywords[i]
+            if not keyword.startswith(prefix):
+                break
+            for key in self.get(keyword):
+                found[key] = None
+            if limit is not None and len(found) >= limit:
+                break
+        return list(found)[:limit]
+
+    def similar(self, keyword: str, max_distance: int = 1, limit: int | None = None) -> list:
+        """
+        Return keys of the objects with a keyword close to the given one, closest first.
+
+        Only keywords that start with a letter (names, emails) are compared.
+
+        Args:
+            keyword (str): Keyword, possibly misspelled.
+            max_distance (int): Maximum edit distance.
+            limit (int | None): Maximum number of keys.
+
+        Returns:
+            list: (edit distance, key) pairs.
+        """
+        trigrams = self._trigrams
+        if trigrams is None:
+            # readers build it side by side, so it is published only when complete
+            trigrams = TrigramIndex()
+            for term in self._keys:
+                if _fuzzy_term(term):
+                    trigrams.add(term)
+            self._trigrams = trigrams
+        found = {}
+        for distance, term in trigrams.search(keyword, max_distance):
+            for key in self.get(term):
+                found.setdefault(key, distance)
+        return [(distance, key) for key, distance in found.items()][:limit]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._keywords.clear()
+        self._sorted = None
+        self._trigrams = None
+
+    def _add(self, keyword, key) -> None:
+        keys = self._keys.get(keyword)
+        if keys is None:
+            self._keys[keyword] = key
+            if self._sorted is not None:
+                insort(self._sorted, keyword)
+            if self._trigrams is not None and _fuzzy_term(keyword):
+                self._trigrams.add(keyword)
+        elif type(keys) is dict:
+            keys[key] = None
+        elif keys != key:
+            self._keys[keyword] = {keys: None, key: None}
+
+    def _discard(self, keyword, key) -> None:
+        keys = self._keys.get(keyword)
+        if type(keys) is dict:
+            keys.pop(key, None)
+            if len(keys) == 1:
+                self._keys[keyword] = next(iter(keys))
+        elif keys == key:
+            del self._keys[keyword]
+            if self._sorted is not None:
+                del self._sorted[bisect_left(self._sorted, keyword)]
+            if self._trigrams is not None:
+                self._trigrams.discard(keyword)
+
+
+def _fuzzy_term(keyword) -> bool:
+    # телефони й дати починаються з цифри, порівнювати їх за схожістю немає сенсу
+    return isinstance(keyword, str) and keyword[:1].isalpha()
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """
+    Optimal string alignment distance between two strings.
+
+    Like Levenshtein distance, but swapping two neighbouring letters
+    ("jhon" for "john") counts as one edit instead of two.
+    With a limit the computation stops as soon as the distance is known to
+    exceed it, and limit + 1 is returned.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    if limit is not None and previous[-1] > limit:
+        return limit + 1
+    return previous[-1]
+
+
+class TrigramIndex:
+    """
+    Index of terms by their three-letter pieces, for approximate lookups.
+
+    A term within edit distance k of the query shares all but at most 4k of
+    the query's trigrams (a swap of two letters changes four of them), so
+    candidates are taken only from the 4k + 1 rarest trigram lists and then
+    checked with the exact edit distance. Lists hold
+    term ids in compact arrays; removed terms are only marked and the lists
+    are rebuilt once half of the ids are dead.
+    """
+
+    def __init__(self):
+        self._grams = {}
+        self._ids = {}
+        self._terms = []
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def trigrams(term: str) -> set:
+        padded = f"  {term} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, term: str) -> None:
+        if term in self._ids:
+            return
+        term_id = self._ids[term] = len(self._terms)
+        self._terms.append(term)
+        for gram in self.trigrams(term):
+            ids = self._grams.get(gram)
+            if ids is None:
+                ids = self._grams[gram] = array("I")
+            ids.append(term_id)
+
+    def discard(self, term: str) -> None:
+        term_id = self._ids.pop(term, None)
+        if term_id is None:
+            return
+        self._terms[term_id] = None
+        self._removed += 1
+        if self._removed > len(self._ids):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        terms = list(self._ids)
+        self._grams, self._ids, self._terms, self._removed = {}, {}, [], 0
+        for term in terms:
+            self.add(term)
+
+    def search(self, query: str, max_distance: int = 1, limit: int | None = None) -> list:
+        """
+        Find terms within the edit distance of the query.
+
+        Args:
+            query (str): Term to look for.
+            max_distance (int): Maximum edit distance.
+            limit (int | None): Maximum number of results.
+
+        Returns:
+            list: (edit distance, term) pairs, closest first.
+        """
+        grams = self.trigrams(query)
+        need = len(grams) - 4 * max_distance
+        if need < 1:
+            # у короткого запиту з кандидатом може не бути жодної спільної трійки
+            candidates = range(len(self._terms))
+        else:
+            lists = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+            # кандидат мусить бути хоча б в одному з 4k + 1 найкоротших списків
+            candidates = set()
+            for ids in lists[:4 * max_distance + 1]:
+                candidates.update(ids)
+
+        found = []
+        for term_id in candidates:
+            term = self._terms[term_id]
+            if term is None or abs(len(term) - len(query)) > max_distance:
+                continue
+            if need > 1 and len(grams & self.trigrams(term)) < need:
+                continue
+            distance = edit_distance(query, term, max_distance)
+            if distance <= max_distance:
+                found.append((distance, term))
+        found.sort()
+        return found[:limit]
+
+
+class BirthdayIndex:
+    """
+    Index of contacts by birthday (month, day), regardless of the year.
+
+    A window of days can be answered by looking up only the buckets of the
+    dates inside it.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._dates = {}
+
+    def __len__(self):
+        return len(self._dates)
+
+    def update(self, key, birthday) -> None:
+        """
+        Set or reset the birthday of an object.
+
+        Args:
+            key: Key of the object (e.g. contact name).
+            birthday (date | None): Birthday, None if it was removed.
+        """
+        month_day = (birthday.month, birthday.day) if birthday else None
+        old = self._dates.get(key)
+        if old == month_day:
+            return
+        if old is not None:
+            self._discard(old, key)
+        if month_day is None:
+            self._dates.pop(key, None)
+        else:
+            self._buckets.setdefault(month_day, {})[key] = None
+            self._dates[key] = month_day
+
+    def remove(self, key) -> None:
+        """Remove an object from the index."""
+        old = self._dates.pop(key, None)
+        if old is not None:
+            self._discard(old, key)
+
+    def get(self, month: int, day: int) -> list:
+        """Return keys of the objects with a birthday on the month and day."""
+        return list(self._buckets.get((month, day), ()))
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._dates.clear()
+
+    def _discard(self, month_day, key) -> None:
+        keys = self._buckets.get(month_day)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._buckets[month_day]
+
+
+class TextIndex:
+    """
+    Full-text inverted index with BM25 ranking.
+
+    Texts are split into lowercase word tokens. Every token keeps the number
+    of times it occurs in each document, and a sorted token list is used to
+    expand prefixes.
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self):
+        self._postings = {}
+        self._tokens = []
+        self._docs = {}
+        self._total_len = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    @staticmethod
+    def tokenize(text: str) -> list:
+        return _TOKEN_RE.findall(text.casefold())
+
+    def update(self, key, *parts: str) -> None:
+        """
+        Index or re-index the text of a document.
+
+        The parts are kept by reference to skip re-indexing a document whose
+        parts did not change; they are the caller's own strings, not copies.
+
+        Args:
+            key: Key of the document (e.g. note title).
+            *parts (str): Pieces of text to index, e.g. title and content.
+        """
+        doc = self._docs.get(key)
+        if doc is not None and doc[2] == parts:
+            return
+        self.remove(key)
+        counts = Counter(token for part in parts for token in self.tokenize(part))
+        for token, tf in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._tokens, token)
+            postings[key] = tf
+        doc_len = sum(counts.values())
+        self._docs[key] = (counts, doc_len, parts)
+        self._total_len += doc_len
+
+    def remove(self, key) -> None:
+        """Remove a document from the index."""
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        counts, doc_len, _ = doc
+        self._total_len -= doc_len
+        for token in counts:
+            postings = self._postings[token]
+            del postings[key]
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._tokens.clear()
+        self._docs.clear()
+        self._total_len = 0
+
+    def expand(self, term: str, prefix: bool = True) -> list:
+        """Return indexed tokens equal to the term or starting with it."""
+        if not prefix:
+            return [term] if term in self._postings else []
+        start = bisect_left(self._tokens, term)
+        end = bisect_left(self._tokens, term + "\U0010ffff")
+        return self._tokens[start:end]
+
+    def search(self, query: str, mode: str = "and", prefix: bool = True, limit: int | None = None) -> list:
+        """
+        Find documents matching the query, best matches first.
+
+        Args:
+            query (str): Words to look for.
+            mode (str): "and" - every word must match, "or" - any word.
+            prefix (bool): Whether a word also matches longer tokens it starts.
+            limit (int | None): Maximum number of results.
+
+        Returns:
+            list: Keys of the matching documents.
+        """
+        terms = list(dict.fromkeys(self.tokenize(query)))
+        if not terms or not self._docs:
+            return []
+
+        avg_len = self._total_len / len(self._docs) or 1
+        n_docs = len(self._docs)
+        scores = {}
+        matched = None
+        for term in terms:
+            term_docs = set()
+            for token in self.expand(term, prefix):
+                postings = self._postings[token]
+                idf = log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    doc_len = self._docs[key][1]
+                    score = idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * doc_len / avg_len))
+                    scores[key] = scores.get(key, 0) + score
+                    term_docs.add(key)
+            if mode == "and":
+                matched = term_docs if matched is None else matched & term_docs
+                if not matched:
+                    return []
+            else:
+                matched = term_docs if matched is None else matched | term_docs
+
+        rank = lambda key: (-scores[key], key)
+        if limit is None:
+            return sorted(matched, key=rank)
+        return nsmallest(limit, matched, key=rank)
+
+
+_TOKEN_RE = re.compile(r"\w+")
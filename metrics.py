@@ -0,0 +1,311 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from types import FunctionType
+
+
+# Верхні межі кошиків гістограми затримок, мс
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PHASES = ("handler", "books", "validation", "render", "save")
+
+clock = time.perf_counter
+
+_lock = threading.Lock()
+_local = threading.local()
+_commands = {}
+_methods = {}
+_instrumented = []
+_profile = None
+
+
+class Histogram:
+    """Latency histogram with fixed logarithmic buckets."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, percent: float) -> float:
+        """Return the upper bound of the bucket with the percentile, at most the maximum."""
+        rank = self.count * percent / 100
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        buckets = {f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.counts) if n}
+        if self.counts[-1]:
+            buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 4) if self.count else 0,
+            "p50_ms": round(self.percentile(50), 4),
+            "p95_ms": round(self.percentile(95), 4),
+            "p99_ms": round(self.percentile(99), 4),
+            "max_ms": round(self.max, 4),
+            "buckets": buckets,
+        }
+
+
+class CommandStats:
+    __slots__ = ("latency", "errors", "phases", "scanned")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.scanned = 0
+
+    def as_dict(self) -> dict:
+        return {**self.latency.as_dict(), "errors": self.errors, "scanned": self.scanned,
+                "phases_ms": {name: round(ms, 3) for name, ms in self.phases.items()}}
+
+
+class Sample:
+    """
+    Measurement of one running command.
+
+    ``phase`` closes the current phase, e.g. the handler, and starts the next one.
+    Instrumented book methods and validators add their time to the "books" and
+    "validation" phases, which are therefore part of the handler time.
+    """
+
+    __slots__ = ("name", "start", "mark", "phases", "scanned", "status", "depth")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = self.mark = clock()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.scanned = 0
+        self.status = None
+        self.depth = dict.fromkeys(PHASES, 0)
+
+    def phase(self, name: str) -> None:
+        now = clock()
+        self.phases[name] += (now - self.mark) * 1000
+        self.mark = now
+
+
+@contextmanager
+def measure(name: str):
+    """
+    Measure a command and add it to the statistics when it finishes.
+
+    Args:
+        name (str): Command name.
+
+    Yields:
+        Sample: Sample to mark phases and the result status on.
+    """
+    sample = _local.sample = Sample(name)
+    try:
+        yield sample
+    finally:
+        _local.sample = None
+        elapsed = (clock() - sample.start) * 1000
+        with _lock:
+            stats = _commands.get(name)
+            if stats is None:
+                stats = _commands[name] = CommandStats()
+            stats.latency.observe(elapsed)
+            stats.errors += sample.status == "error"
+            stats.scanned += sample.scanned
+            for phase, ms in sample.phases.items():
+                stats.phases[phase] += ms
+
+
+def scanned(count: int) -> None:
+    """Count records looked at by the running command."""
+    sample = getattr(_local, "sample", None)
+    if sample is not None:
+        sample.scanned += count
+
+
+def _timed(func, key: str, phase: str):
+    @wraps(func)
+    def inner(*args, **kwargs):
+        sample = getattr(_local, "sample", None)
+        if sample is not None:
+            sample.depth[phase] += 1
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            ms = (clock() - start) * 1000
+            if sample is not None:
+                sample.depth[phase] -= 1
+                # вкладені виклики вже враховані у зовнішньому
+                if sample.depth[phase] == 0:
+                    sample.phases[phase] += ms
+            with _lock:
+                histogram = _methods.get(key)
+                if histogram is None:
+                    histogram = _methods[key] = Histogram()
+                histogram.observe(ms)
+    return inner
+
+
+def instrument(phase: str, *classes) -> None:
+    """
+    Time the public methods of the classes until ``uninstrument`` is called.
+
+    Args:
+        phase (str): "books" or "validation", the phase the time is counted in.
+        *classes: Classes whose own public methods, static and class methods
+            included, are replaced with timed wrappers.
+    """
+    for cls in classes:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_"):
+                continue
+            if isinstance(value, (staticmethod, classmethod)):
+                # обгортається сама функція, а дескриптор лишається того ж типу
+                wrapped = type(value)(_timed(value.__func__, f"{cls.__name__}.{attr}", phase))
+            elif isinstance(value, FunctionType):
+                wrapped = _timed(value, f"{cls.__name__}.{attr}", phase)
+            else:
+                continue
+            _instrumented.append((cls, attr, value))
+            setattr(cls, attr, wrapped)
+
+
+def uninstrument() -> None:
+    """Put the original methods back."""
+    while _instrumented:
+        cls, attr, func = _instrumented.pop()
+        setattr(cls, attr, func)
+
+
+def enable() -> None:
+    """Time the AddressBook/NoteBook/Record/Note methods and the field validators."""
+    from record import AddressBook, NoteBook, Record, Note
+    from models import Field, Name, Phone, Birthday, Address, Email, NoteText, Title
+    # "stats on" може прийти з кількох потоків сервера одночасно
+    with _lock:
+        if _instrumented:
+            return
+        instrument("books", AddressBook, NoteBook, Record, Note)
+        instrument("validation", Field, Name, Phone, Birthday, Address, Email, NoteText, Title)
+
+
+def disable() -> None:
+    with _lock:
+        uninstrument()
+
+
+def enabled() -> bool:
+    return bool(_instrumented)
+
+
+def reset() -> None:
+    with _lock:
+        _commands.clear()
+        _methods.clear()
+
+
+def collect() -> dict:
+    """Return the collected statistics as a JSON-ready dict."""
+    with _lock:
+        return {
+            "methods_timed": enabled(),
+            "commands": {name: stats.as_dict() for name, stats in sorted(_commands.items())},
+            "methods": {name: histogram.as_dict() for name, histogram in sorted(_methods.items())},
+        }
+
+
+def report() -> str:
+    """Return the statistics of commands and the slowest methods as text."""
+    data = collect()
+    if not data["commands"]:
+        return "No commands measured yet."
+    lines = [f"{'command':<22}{'count':>7}{'err':>5}{'avg ms':>10}{'p95 ms':>10}{'max ms':>10}"
+             f"{'handler':>10}{'books':>10}{'valid.':>10}{'render':>10}{'save':>10}{'scanned':>10}"]
+    for name, stats in data["commands"].items():
+        count = stats["count"]
+        phases = [stats["phases_ms"][phase] / count for phase in PHASES]
+        lines.append(f"{name:<22}{count:>7}{stats['errors']:>5}{stats['avg_ms']:>10.3f}{stats['p95_ms']:>10.3f}"
+                     f"{stats['max_ms']:>10.3f}" + "".join(f"{ms:>10.3f}" for ms in phases)
+                     + f"{stats['scanned'] // count:>10}")
+    lines.append("Phases are averages in ms; books and validation are parts of handler time.")
+    if data["methods"]:
+        lines.append("")
+        lines.append(f"{'method':<36}{'calls':>9}{'total ms':>12}{'avg ms':>10}{'max ms':>10}")
+        slowest = sorted(data["methods"].items(), key=lambda item: -item[1]["total_ms"])[:15]
+        for name, stats in slowest:
+            lines.append(f"{name:<36}{stats['count']:>9}{stats['total_ms']:>12.3f}{stats['avg_ms']:>10.4f}"
+                         f"{stats['max_ms']:>10.3f}")
+    elif not data["methods_timed"]:
+        lines.append('Use "stats on" to time book methods and validators as well.')
+    return "\n".join(lines)
+
+
+def dump(filename: str) -> None:
+    """Write the statistics to a JSON file."""
+    import json
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(collect(), f, indent=2)
+
+
+def profiling() -> bool:
+    return _profile is not None
+
+
+def can_profile() -> bool:
+    """cProfile sees only the thread it runs in, so profile only commands run on the main thread."""
+    return threading.current_thread() is threading.main_thread()
+
+
+def start_profile() -> None:
+    """Start cProfile and tracemalloc in the current thread."""
+    global _profile
+    import cProfile
+    import tracemalloc
+    tracemalloc.start()
+    _profile = cProfile.Profile()
+    _profile.enable()
+
+
+def stop_profile(limit: int = 15) -> str:
+    """
+    Stop profiling and return the report.
+
+    Args:
+        limit (int): Number of functions and allocation sites to show.
+
+    Returns:
+        str: Functions with the highest cumulative time and the largest allocation sites.
+    """
+    global _profile
+    import tracemalloc
+    profile, _profile = _profile, None
+    profile.disable()
+    memory = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # звіт будується вже після зупинки, щоб його імпорти не потрапили в профіль
+    import io
+    import pstats
+
+    out = io.StringIO()
+    pstats.Stats(profile, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    lines = [out.getvalue().strip(), "", f"Peak traced memory: {peak / 1024:.1f} KiB", "Largest allocations:"]
+    for stat in memory.statistics("lineno")[:limit]:
+        lines.append(f"  {stat}")
+    return "\n".join(lines)
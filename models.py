@@ -1,104 +1,249 @@
 import re
-from datetime import datetime as dtdt
+from datetime import date
 
-from utils import input_error
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+PHONE_SEPARATORS = str.maketrans("", "", " -().")
+
+
+def parse_date(text: str) -> date | None:
+    """
+    Parse a DD.MM.YYYY date, None if it is not a valid date.
+
+    Accepts the same dates as strptime with "%d.%m.%Y" (day and month may
+    have one digit) without its regex and locale machinery.
+    """
+    if len(text) == 10 and text[2] == "." and text[5] == ".":
+        day, month, year = text[:2], text[3:5], text[6:]
+    else:
+        parts = text.split(".")
+        if len(parts) != 3:
+            return None
+        day, month, year = parts
+        if not (0 < len(day) <= 2 and 0 < len(month) <= 2 and len(year) == 4):
+            return None
+    if not (day.isdecimal() and month.isdecimal() and year.isdecimal()) or not text.isascii():
+        return None
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
 
 
 class Field:
+    """
+    Base class of validated values.
+
+    Subclasses define ``normalize`` that returns the stored form of a value or
+    None if it is invalid, and ``error`` shown for invalid values.
+    """
+
+    __slots__ = ("value",)
+    error = "Invalid value."
+
     def __init__(self, value):
         self.value = value
 
     def __str__(self):
         return str(self.value)
 
+    @staticmethod
+    def normalize(value):
+        return value
+
+    @classmethod
+    def from_normalized(cls, value) -> "Field":
+        """Create a field from a value already returned by normalize, without validating it again."""
+        field = cls.__new__(cls)
+        field.value = value
+        return field
+
+    @classmethod
+    def validate_many(cls, values) -> tuple:
+        """
+        Validate many values without creating field objects.
+
+        Args:
+            values: Iterable of raw values.
+
+        Returns:
+            tuple: List of normalized values (None for invalid ones) and
+                list of (index, error message) pairs of the invalid values.
+        """
+        normalize = cls.normalize
+        normalized = [normalize(value) for value in values]
+        errors = [(i, cls.error) for i, value in enumerate(normalized) if value is None]
+        return normalized, errors
+
+    def __getstate__(self):
+        return {"value": self.value}
+
+    def __setstate__(self, state):
+        # підтримує і старі об'єкти, збережені разом з __dict__
+        self.value = state["value"]
+
 
 class Name(Field):
+    __slots__ = ()
+    error = "⚠️ Please enter a valid contact name."
+
     def __init__(self, value):
         super().__init__(value)
         self.validate(value)
 
-    @input_error
+    @staticmethod
+    def normalize(name) -> str | None:
+        if type(name) is str and name.isalpha():
+            return name.lower()
+        return None
+
     def validate(self, name):
-        if name.isalpha():
-            self.value = name.lower()
-        else:
-            self.value = None
-            return "⚠️ Please enter a valid contact name.", "warning"
+        self.value = self.normalize(name)
+        if self.value is None:
+            return self.error, "warning"
 
 
 class Phone(Field):
+    __slots__ = ()
+    error = "Please enter a valid phone number."
+
     def __init__(self, value):
         super().__init__(value)
         self.validate(value)
 
-    @input_error
+    @classmethod
+    def from_number(cls, number: int) -> "Phone":
+        """Create a phone from a number packed by Phone.pack without validating it again."""
+        phone = cls.__new__(cls)
+        phone.value = f"{number:010d}"
+        return phone
+
+    @staticmethod
+    def pack(phone: str) -> int | None:
+        """Pack a 10-digit phone into an int, None if the phone is invalid."""
+        phone = Phone.normalize(phone)
+        return None if phone is None else int(phone)
+
+    @staticmethod
+    def normalize(phone) -> str | None:
+        """
+        Return the phone as 10 digits, None if it is invalid.
+
+        Spaces, dashes, dots, parentheses and the +38 country code are dropped,
+        so "+38 (050) 123-45-67" becomes "0501234567".
+        """
+        if type(phone) is not str:
+            return None
+        if len(phone) != 10 or not phone.isdigit():
+            phone = phone.translate(PHONE_SEPARATORS).removeprefix("+")
+            if len(phone) == 12 and phone.startswith("38"):
+                phone = phone[2:]
+        if len(phone) == 10 and phone.isdigit() and phone.isascii():
+            return phone
+        return None
+
     def validate(self, phone):
-        if phone.isdigit() and len(phone) == 10:
-            self.value = phone
-        else:
-            self.value = None
+        self.value = self.normalize(phone)
 
 
 class Birthday(Field):
+    """Birthday stored as a date ordinal."""
+
+    __slots__ = ("_ordinal",)
+    error = "⚠️  Invalid date format. Try DD.MM.YYYY."
+
     def __init__(self, value):
         self.value = None
         self.validate_bd(value)
 
-    @input_error
+    @property
+    def value(self) -> date | None:
+        return None if self._ordinal is None else date.fromordinal(self._ordinal)
+
+    @value.setter
+    def value(self, value: date | None):
+        self._ordinal = None if value is None else value.toordinal()
+
+    @staticmethod
+    def normalize(birthday) -> date | None:
+        if type(birthday) is str:
+            return parse_date(birthday)
+        return None
+
     def validate_bd(self, birthday):
-        self.value = dtdt.strptime(birthday, "%d.%m.%Y").date()
+        self.value = self.normalize(birthday)
 
 
 class Title(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
         self.validated_title(value)
 
-    @input_error
-    def validated_title(self, title):
+    @staticmethod
+    def normalize(title) -> str | None:
         if type(title) is str and len(title) < 15:
-            self.value = title
-        else:
-            self.value = None
+            return title
+        return None
+
+    def validated_title(self, title):
+        self.value = self.normalize(title)
 
 
 class NoteText(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
         self.validated_notetext(value)
     
-    @input_error
+    @staticmethod
+    def normalize(text) -> str | None:
+        if type(text) is str and text.strip().strip('"') != "":
+            return text
+        return None
+
     def validated_notetext(self, text):
-        if text is not None and text.strip().strip('"') != "":
-            self.value = text
-        else:
-            self.value = None
+        self.value = self.normalize(text)
 
                       
 class Address(Field):
+    __slots__ = ()
+    error = "Please enter a valid address."
+
     def __init__(self, value):
         self.value = None
         self.validate(value)
 
-    @input_error
+    @staticmethod
+    def normalize(address) -> str | None:
+        if type(address) is str and len(address) >= 3 and not address.isspace():
+            return address
+        return None
+
     def validate(self, address):
-        if not address.isspace() and len(address) >= 3:
-            self.value = address
+        self.value = self.normalize(address)
 
             
 class Email(Field):
+    __slots__ = ()
+    error = "Please enter a valid email address (e.g. example@mail.com)."
+
     def __init__(self, value):
         super().__init__(value)
         self.validate(value)
-    
-    @input_error
+
+    @staticmethod
+    def normalize(email) -> str | None:
+        if type(email) is str and EMAIL_PATTERN.fullmatch(email):
+            return email.lower()
+        return None
+
     def validate(self, email):
-        email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        if re.match(email_pattern, email):
-            self.value = email.lower()
-        else:
-            self.value = None
-            return "Please enter a valid email address (e.g. example@mail.com).", "warning"
+        self.value = self.normalize(email)
+        if self.value is None:
+            return self.error, "warning"
 
     def update(self, new_email):
         self.validate(new_email)
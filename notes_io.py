@@ -0,0 +1,140 @@
+import glob
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from record import Note, NoteBook
+
+
+class ZipMembers:
+    """
+    Readers of zip archive members for a thread pool.
+
+    Every thread opens the archive once and decompresses its own members, so
+    the reads overlap and only the files being read are held in memory.
+    The handles are closed on exit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._archives = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            for archive in self._archives:
+                archive.close()
+            self._archives.clear()
+
+    def text_members(self) -> list:
+        """ZipInfo of the .txt members in the archive order."""
+        with zipfile.ZipFile(self.path) as archive:
+            return [info for info in archive.infolist()
+                    if not info.is_dir() and info.filename.endswith(".txt")]
+
+    def reader(self, member: zipfile.ZipInfo):
+        def read():
+            archive = getattr(self._local, "archive", None)
+            if archive is None:
+                archive = self._local.archive = zipfile.ZipFile(self.path)
+                with self._lock:
+                    self._archives.append(archive)
+            return archive.read(member)
+        return read
+
+
+def iter_note_sources(path: str, stack: ExitStack):
+    """
+    Yield text files to import as (name, reader) pairs.
+
+    Args:
+        path (str): Directory, glob pattern or zip archive.
+        stack (ExitStack): Keeps the archive handles open until the readers are done.
+    """
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        members = stack.enter_context(ZipMembers(path))
+        for info in members.text_members():
+            yield info.filename, members.reader(info)
+    elif os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for file_name in sorted(files):
+                if file_name.endswith(".txt"):
+                    yield os.path.join(root, file_name), _file_reader(os.path.join(root, file_name))
+    else:
+        for file_path in sorted(glob.glob(path, recursive=True)):
+            if os.path.isfile(file_path) and file_path.endswith(".txt"):
+                yield file_path, _file_reader(file_path)
+
+
+def _file_reader(file_path: str):
+    def read():
+        with open(file_path, "rb") as f:
+            return f.read()
+    return read
+
+
+def load_note(source: tuple) -> tuple:
+    """
+    Read one file and turn it into a note.
+
+    The title is the file name without the extension.
+
+    Args:
+        source (tuple): Name and reader from iter_note_sources.
+
+    Returns:
+        tuple: Name, Note or None, error message or None.
+    """
+    name, read = source
+    try:
+        text = read().decode("utf-8")
+    except (OSError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+        return name, None, str(e)
+
+    title, _ = os.path.splitext(os.path.basename(name))
+    note = Note()
+    message = note.add_title(title) or note.add_text(text)
+    if message:
+        return name, None, message[0]
+    return name, note, None
+
+
+def import_notes(book: NoteBook, path: str, workers: int = 8) -> dict:
+    """
+    Import every text file found at the path into the notebook.
+
+    Files are read and validated on a thread pool and added in one batch.
+
+    Args:
+        book (NoteBook): NoteBook to add the notes to.
+        path (str): Directory, glob pattern or zip archive.
+        workers (int): Number of reader threads.
+
+    Returns:
+        dict: Numbers of imported, skipped and failed files, errors and elapsed time.
+    """
+    start = time.perf_counter()
+    notes, errors = [], []
+    # пул завершується раніше, ніж закриваються архіви
+    with ExitStack() as stack, ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, note, error in pool.map(load_note, iter_note_sources(path, stack)):
+            if note is None:
+                errors.append(f"{name}: {error}")
+            else:
+                notes.append(note)
+
+    added, skipped = book.add_notes(notes)
+    return {
+        "imported": added,
+        "skipped": skipped,
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+    }
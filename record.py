@@ -1,18 +1,60 @@
+import os
 from datetime import datetime as dtdt
 from datetime import timedelta
+from array import array
 from collections import UserDict
+from itertools import islice
 
-from utils import input_error
+import metrics
+from concurrency import NO_LOCK, RWLock, read_locked, write_locked
 from models import Name, Phone, Birthday, Address, Email, NoteText, Title
+from indexes import KeywordIndex, BirthdayIndex, TextIndex
+from render_cache import renders
 
 
 class Record:
+    """
+    Contact record.
+
+    Phones are kept packed as ints in an array; ``phones`` builds Phone
+    objects from it on access.
+    """
+
+    __slots__ = ("name", "_phones", "birthday", "address", "email", "_book")
+
     def __init__(self, name):
         self.name = Name(name)
-        self.phones = []
+        self._phones = array("Q")
         self.birthday = None
         self.address = None
         self.email = None
+        self._book = None
+
+    @classmethod
+    def from_normalized(cls, name: str, phones=(), birthday=None, email=None, address=None) -> "Record":
+        """
+        Create a record from values already normalized by the field validators.
+
+        Used by bulk imports after Field.validate_many, so nothing is validated twice.
+
+        Args:
+            name (str): Normalized name.
+            phones: Normalized 10-digit phones.
+            birthday (date | None): Birthday.
+            email (str | None): Normalized email.
+            address (str | None): Address.
+
+        Returns:
+            Record: New record.
+        """
+        record = cls.__new__(cls)
+        record.name = Name.from_normalized(name)
+        record._phones = array("Q", dict.fromkeys(int(phone) for phone in phones))
+        record.birthday = None if birthday is None else Birthday.from_normalized(birthday)
+        record.email = None if email is None else Email.from_normalized(email)
+        record.address = None if address is None else Address.from_normalized(address)
+        record._book = None
+        return record
 
     def __str__(self):
         birthday_str = ""
@@ -24,10 +66,64 @@ class Record:
             address_str = f", address: {self.address}"
         if self.email:
             email_str = f", email: {self.email}"
-        return (f"Contact name: {self.name.value}, phones: {'; '.join(str(p.value) for p in self.phones)}"
+        return (f"Contact name: {self.name.value}, phones: {'; '.join(self.phone_values())}"
                 + birthday_str + email_str + address_str)
 
-    @input_error
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "_book"}
+
+    def __setstate__(self, state):
+        if "phones" in state:
+            # старий формат: список об'єктів Phone
+            state["_phones"] = array("Q", (int(p.value) for p in state.pop("phones")))
+        self._book = None
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    @property
+    def phones(self) -> list:
+        """Phones of the record as Phone objects."""
+        return [Phone.from_number(number) for number in self._phones]
+
+    def phone_values(self) -> list:
+        """Phones of the record as strings."""
+        return [f"{number:010d}" for number in self._phones]
+
+    def row(self) -> list:
+        """
+        Table row of the contact: name, phones, birthday, email and address.
+
+        The row is cached until the record changes.
+        """
+        row = renders.get(self)
+        if row is None:
+            row = (
+                self.name.value.capitalize(),
+                "; ".join(self.phone_values()),
+                self.birthday.value.strftime('%d.%m.%Y') if self.birthday else "-",
+                self.email.value if self.email else "-",
+                self.address.value if self.address else "-",
+            )
+            renders.put(self, row)
+        return list(row)
+
+    @property
+    def lock(self):
+        """Lock of the book this object belongs to."""
+        return self._book.lock if self._book is not None else NO_LOCK
+
+    def _touch(self):
+        renders.discard(self)
+        if self._book is not None:
+            self._book._changed(self)
+
+    def _phone_owner(self, number: int) -> str | None:
+        """Return the other contact of the book with the phone, if phones must be unique."""
+        if self._book is None:
+            return None
+        return self._book.phone_conflict(self.name.value, (number,))
+
+    @write_locked
     def add_phone(self, phone: str) -> tuple:
         """
         Add a phone to the record
@@ -41,13 +137,17 @@ class Record:
         phone = Phone(phone)
         if phone.value is None:
             return "Please enter a valid phone number.", "warning"
-        elif phone.value not in [i.value for i in self.phones]:
-            self.phones.append(phone)
-            return "Phone added.", "success"
-        else:
+        number = int(phone.value)
+        if number in self._phones:
             return "⚠️  Phone already exists.", "warning"
-
-    @input_error
+        owner = self._phone_owner(number)
+        if owner is not None:
+            return f"⚠️  Phone {phone} already belongs to {owner.capitalize()}.", "warning"
+        self._phones.append(number)
+        self._touch()
+        return "Phone added.", "success"
+
+    @write_locked
     def remove_phone(self, phone_rm: str) -> tuple:
         """
         Remove a phone from the record
@@ -58,14 +158,15 @@ class Record:
         Returns:
             tuple: message
         """
-        for phone in self.phones:
-            if phone_rm == phone.value:
-                self.phones.remove(phone)
-                return f"Phone {phone_rm} removed.", "success"
+        number = Phone.pack(phone_rm)
+        if number is not None and number in self._phones:
+            self._phones.remove(number)
+            self._touch()
+            return f"Phone {phone_rm} removed.", "success"
 
         return "⚠️  No such phone exists.", "warning"
 
-    @input_error
+    @write_locked
     def edit_phone(self, old_phone: str, new_phone: str) -> tuple:
         """
         Edit a phone in the record
@@ -82,14 +183,17 @@ class Record:
         if new_phone.value is None:
             return "⚠️  Please enter a valid phone number.", "warning"
 
-        for phone in self.phones:
-            if old_phone == phone.value and new_phone.value:
-                phone.value = new_phone.value
-                return f"Phone {old_phone} changed to {new_phone}.", "success"
+        number = Phone.pack(old_phone)
+        if number is not None and number in self._phones:
+            owner = self._phone_owner(int(new_phone.value))
+            if owner is not None:
+                return f"⚠️  Phone {new_phone} already belongs to {owner.capitalize()}.", "warning"
+            self._phones[self._phones.index(number)] = int(new_phone.value)
+            self._touch()
+            return f"Phone {old_phone} changed to {new_phone}.", "success"
 
         return "⚠️  No such phone exists.", "warning"
 
-    @input_error
     def find_phone(self, phone_to_find: str) -> tuple:
         """
         Find a phone in the record
@@ -100,25 +204,25 @@ class Record:
         Returns:
             tuple: message
         """
-        for phone in self.phones:
-            if phone_to_find == phone.value:
-                return phone
+        number = Phone.pack(phone_to_find)
+        if number is not None and number in self._phones:
+            return Phone.from_number(number)
 
-    @input_error
+    @write_locked
     def add_birthday(self, birthday):
-        self.birthday = Birthday(birthday)
-        if self.birthday.value is None:
-            self.birthday = None
+        birthday = Birthday(birthday)
+        if birthday.value is None:
             return "⚠️  Invalid date format. Try DD.MM.YYYY.", "warning"
+        self.birthday = birthday
+        self._touch()
         return "Birthday added.", "success"
 
-    @input_error
     def show_birthday(self):
         if self.birthday is None:
             return "⚠️  No birthday found.", "warning"
-        return f"{self.name.value.capitalize()}'s birthday: {dtdt.strftime(self.birthday.value, '%d.%m.%Y')}"
+        return f"{self.name.value.capitalize()}'s birthday: {dtdt.strftime(self.birthday.value, '%d.%m.%Y')}", "common"
 
-    @input_error
+    @write_locked
     def add_address(self, *args) -> tuple:
         address = " ".join(args)
         address = Address(address)
@@ -128,15 +232,15 @@ class Record:
             return "⚠️  Address already exists.", "warning"
         else:
             self.address = address
+            self._touch()
             return "Address added.", "success"
 
-    @input_error
     def show_address(self, *args) -> tuple:
         if self.address is None:
             return "⚠️  No address found.", "warning"
         return self.address.value, "common"
 
-    @input_error
+    @write_locked
     def edit_address(self, address: str, *args) -> tuple:
         address = Address(address)
         if self.address is None:
@@ -145,14 +249,16 @@ class Record:
             return "⚠️  Please enter a valid address.", "warning"
         else:
             self.address = address
+            self._touch()
             return "Address changed.", "success"
 
-    @input_error
+    @write_locked
     def delete_address(self, *args) -> tuple:
         self.address = None
+        self._touch()
         return "Address deleted.", "success"
 
-    @input_error
+    @write_locked
     def add_email(self, email):
         if hasattr(self, "email") and self.email is not None:
             return "⚠️  This contact already has an email.", "warning"
@@ -162,9 +268,10 @@ class Record:
             return "⚠️  Please enter a valid email address.", "warning"
 
         self.email = email_obj
+        self._touch()
         return "Email added.", "success"
 
-    @input_error
+    @write_locked
     def edit_email(self, new_email):
         email = Email(new_email)
         if email.value is None:
@@ -172,25 +279,25 @@ class Record:
         if self.email is None:
             return "⚠️  No email found.", "warning"
         self.email = email
+        self._touch()
         return "Email changed.", "success"
 
-    @input_error
+    @write_locked
     def delete_email(self):
         if self.email is None or self.email.value is None:
             return "⚠️  No email found to delete.", "warning"
         self.email = None
+        self._touch()
         return "Email deleted.", "success"
 
-    @input_error
     def show_email(self):
         if self.email is None or self.email.value is None:
             return "⚠️  No email found.", "warning"
         return f"{self.name.value.capitalize()}'s email: {self.email.value}", "common"
 
-    @input_error
     def get_contact_keywords(self):
         keywords = [self.name.value]
-        [keywords.append(p.value) for p in self.phones]
+        keywords.extend(self.phone_values())
         if self.birthday:
             keywords.append(self.birthday.value.strftime("%d.%m.%Y"))
         if self.email:
@@ -199,39 +306,71 @@ class Record:
 
 
 class Note:
+    _book = None
+
     def __init__(self):
         self.title = None
         self.text = None
-        self.tags = []
+        self.tags = {}
         self.created_date = dtdt.now().replace(microsecond=0)
         self.updated_date = dtdt.now().replace(microsecond=0)
     
     def format_for_display(self):
-        tag_line = f"Tags: {', '.join(self.tags)}\n" if self.tags else "Tags: "
-        return (
-            f"{'='*35}\n"
-            f"📌 Title: {self.title.value}\n"
-            f"📝 Content: {self.text.value}\n"
-            f"🏷️  {tag_line}\n"
-            f"🕒 Created: {self.created_date}\n"
-            f"🕒 Updated: {self.updated_date}\n"
-            f"{'='*35}"
-        )
+        text = renders.get(self)
+        if text is None:
+            tag_line = f"Tags: {', '.join(self.tags)}\n" if self.tags else "Tags: "
+            text = (
+                f"{'='*35}\n"
+                f"📌 Title: {self.title.value}\n"
+                f"📝 Content: {self.text.value}\n"
+                f"🏷️  {tag_line}\n"
+                f"🕒 Created: {self.created_date}\n"
+                f"🕒 Updated: {self.updated_date}\n"
+                f"{'='*35}"
+            )
+            renders.put(self, text)
+        return text
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_book", None)
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state.get("tags"), list):
+            # старий формат: теги зберігались списком
+            state["tags"] = dict.fromkeys(state["tags"])
+        self.__dict__.update(state)
+
+    @property
+    def lock(self):
+        """Lock of the book this object belongs to."""
+        return self._book.lock if self._book is not None else NO_LOCK
+
+    def _touch(self):
+        renders.discard(self)
+        if self._book is not None:
+            self._book._changed(self)
     
+    @write_locked
     def add_title(self, title_str):
         title = Title(title_str)
         if title.value is None:
             return "⚠️  Note cannot be empty.", "warning"
         self.title = title
+        self._touch()
         return None
         
+    @write_locked
     def add_text(self, text_str):
         text = NoteText(text_str)
         if text.value is None:
             return "⚠️  Text cannot be empty.", "warning"
         self.text = text
+        self._touch()
         return None
 
+    @write_locked
     def add_tag(self, tag: str) -> tuple:
         """
         Add a tag to the note.
@@ -246,9 +385,11 @@ class Note:
             return "⚠️  Tag cannot be empty.", "warning"
         elif tag in self.tags:
             return "⚠️  Tag already exists or invalid.", "warning"
-        self.tags.append(tag)
+        self.tags[tag] = None
+        self._touch()
         return f"Tag '{tag}' added to the note.", "success"
 
+    @write_locked
     def remove_tag(self, tag: str) -> tuple:
         """
         Remove a tag from the note.
@@ -260,17 +401,149 @@ class Note:
             tuple: Success message or warning if tag not found.
         """
         if tag in self.tags:
-            self.tags.remove(tag)
+            del self.tags[tag]
+            self._touch()
             return f"Tag '{tag}' removed from the note.", "success"
         return f"⚠️  Tag '{tag}' not found in this note.", "warning"
 
 
 class NoteBook:
+    _journal = None
+    _source = None
+    lock = NO_LOCK
+
     def __init__(self):
         super().__init__()
-        self.notes = []
+        self._notes = {}
+        self._text = TextIndex()
+        self._tags = KeywordIndex()
+
+    def __getstate__(self):
+        self._load_all()
+        state = self.__dict__.copy()
+        for attr in ("_journal", "_text", "_tags", "_source", "_seen", "lock"):
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        if "notes" in state:
+            # старий формат: нотатки зберігались списком
+            notes = state.pop("notes")
+            state["_notes"] = {self._key(note.title.value): note for note in notes}
+        self.__dict__.update(state)
+        self._text = TextIndex()
+        self._tags = KeywordIndex()
+        for key, note in self._notes.items():
+            note._book = self
+            self._index(key, note)
+
+    @property
+    def notes(self):
+        """Notes in the order they were added."""
+        self._load_all()
+        return self._notes.values()
+
+    @staticmethod
+    def _key(title: str) -> str:
+        return title.casefold()
+
+    def enable_locking(self) -> None:
+        """
+        Make the book safe to use from several threads.
+
+        Changes take the write side of a reader/writer lock, scans take the
+        read side and single lookups take no lock at all. Records are read
+        from the snapshot on demand by mutating the book, so the rest of
+        them are loaded first.
+        """
+        self._load_all()
+        self.lock = RWLock()
+
+    def attach_snapshot(self, source) -> None:
+        """
+        Serve notes from a snapshot section, reading every note on first access.
+
+        Args:
+            source (SnapshotSection): Snapshot section with the notes.
+        """
+        self._source = source
+        self._seen = set()
+
+    def _get(self, key: str) -> Note | None:
+        note = self._notes.get(key)
+        if note is None and self._source is not None and key not in self._seen:
+            self._seen.add(key)
+            note = self._source.get(key)
+            if note is not None:
+                self._put(key, note)
+        return note
+
+    def _put(self, key: str, note: Note) -> None:
+        self._notes[key] = note
+        note._book = self
+        self._index(key, note)
+
+    @write_locked
+    def put_note(self, note: Note) -> None:
+        """
+        Store a note replayed from the journal, replacing a note with the same title in place.
+
+        Args:
+            note (Note): Note to store.
+        """
+        key = self._key(note.title.value)
+        if self._source is not None:
+            self._seen.add(key)
+        self._put(key, note)
+
+    def _load_all(self) -> None:
+        """Read the rest of the notes from the snapshot, keeping their order."""
+        if self._source is None:
+            return
+        source, self._source = self._source, None
+        keys = source.keys()
+        unread = [key for key in keys if key not in self._notes and key not in self._seen]
+        stored = dict(zip(unread, source.get_many(unread)))
+        notes = {}
+        for key in keys:
+            if key in self._notes:
+                notes[key] = self._notes[key]
+            elif key in stored:
+                notes[key] = stored[key]
+        for key, note in self._notes.items():
+            notes.setdefault(key, note)
+        loaded, self._notes = self._notes, notes
+        for key, note in notes.items():
+            if key not in loaded:
+                self._put(key, note)
+        self._seen = set()
+
+    def _stored_items(self):
+        """Yield (key, Note or pickled note) pairs without reading unchanged notes."""
+        if self._source is None:
+            yield from self._notes.items()
+            return
+        for key in self._source.keys():
+            if key in self._notes:
+                yield key, self._notes[key]
+            elif key not in self._seen:
+                yield key, self._source.raw(key)
+        for key, note in list(self._notes.items()):
+            if key not in self._source:
+                yield key, note
+
+    def _index(self, key: str, note: Note) -> None:
+        text = note.text.value if note.text else ""
+        self._text.update(key, note.title.value, text)
+        self._tags.update(key, note.tags)
+
+    @write_locked
+    def _changed(self, note: Note) -> None:
+        self._index(self._key(note.title.value), note)
+        if self._journal is not None:
+            self._journal.record("note", note.title.value, note)
     
-    @input_error
+    @write_locked
     def add_note(self, note: Note) -> tuple:
         """
         Add a new note to the notebook.
@@ -281,14 +554,38 @@ class NoteBook:
         Returns:
             tuple: Message and message type indicating success or validation warning.
         """
-        if self.find_note(note.title.value):
-            return "⚠️  Note with this title already exists. Change the title", "warning"
-        elif note.title.value is None:
+        if note.title is None or note.title.value is None:
             return "⚠️  Title must be 15 characters or less.", "warning"
-        self.notes.append(note)
+        key = self._key(note.title.value)
+        if self._get(key) is not None:
+            return "⚠️  Note with this title already exists. Change the title", "warning"
+        self._notes[key] = note
+        note._book = self
+        self._changed(note)
         return "Note added.", "success"
     
-    @input_error
+    @write_locked
+    def add_notes(self, notes: list) -> tuple:
+        """
+        Add many notes at once, skipping notes with an existing title.
+
+        Args:
+            notes (list): Note objects with title and content.
+
+        Returns:
+            tuple: Number of added and skipped notes.
+        """
+        added = 0
+        for note in notes:
+            key = self._key(note.title.value)
+            if self._get(key) is not None:
+                continue
+            self._notes[key] = note
+            note._book = self
+            self._changed(note)
+            added += 1
+        return added, len(notes) - added
+
     def find_note(self, title: str) -> Note | None:
         """
         Search for a note by its title.
@@ -299,11 +596,9 @@ class NoteBook:
         Returns:
             Note | None: Note object if found, otherwise None.
         """
-        for note in self.notes:
-            if note.title.value.lower() == title.lower():
-                return note
+        return self._get(self._key(title))
     
-    @input_error
+    @write_locked
     def delete_note(self, title: str) -> tuple | None:
         """
         Delete a note by its title.
@@ -314,12 +609,19 @@ class NoteBook:
         Returns:
             tuple | None: Message indicating success or None if not found.
         """
-        for note in self.notes:
-            if note.title.value.lower() == title.lower():
-                self.notes.remove(note)
-                return "Note deleted.", "success"
+        key = self._key(title)
+        if self._get(key) is None:
+            return None
+        note = self._notes.pop(key)
+        self._text.remove(key)
+        self._tags.remove(key)
+        note._book = None
+        renders.discard(note)
+        if self._journal is not None:
+            self._journal.record("note", note.title.value, None)
+        return "Note deleted.", "success"
             
-    @input_error
+    @write_locked
     def edit_note(self, title: str, new_text: str) -> tuple:
         """
         Edit the content of a note by its title.
@@ -331,17 +633,37 @@ class NoteBook:
         Returns:
             tuple: Message indicating success or warning if validation fails.
         """
-        for note in self.notes:
-            if note.title.value.lower() == title.lower():
-                txt = NoteText(new_text)
-                if txt.value is None:
-                    return "⚠️  Note cannot be empty.", "warning"
-                else:
-                    note.text = txt
-                    note.updated_date = dtdt.now().replace(microsecond=0)
-                    return "Note edited.", "success"
+        note = self._get(self._key(title))
+        if note is None:
+            return None
+        txt = NoteText(new_text)
+        if txt.value is None:
+            return "⚠️  Note cannot be empty.", "warning"
+        note.text = txt
+        note.updated_date = dtdt.now().replace(microsecond=0)
+        note._touch()
+        return "Note edited.", "success"
     
-    @input_error
+    @read_locked
+    def search(self, query: str, mode: str = "and", limit: int | None = None) -> list:
+        """
+        Find notes by words in their title or content, best matches first.
+
+        Each word of the query also matches longer words that start with it.
+
+        Args:
+            query (str): Words to search for.
+            mode (str): "and" - a note must contain every word, "or" - any of them.
+            limit (int | None): Maximum number of notes to return.
+
+        Returns:
+            list: List of matching notes.
+        """
+        self._load_all()
+        keys = self._text.search(query, mode, limit=limit)
+        metrics.scanned(len(keys))
+        return [self._notes[key] for key in keys]
+
     def search_notes(self, keyword: str) -> list:
         """
         Search for notes that contain the keyword in their title or content.
@@ -352,13 +674,9 @@ class NoteBook:
         Returns:
             list: List of string representations of matching notes.
         """
-        notes = []
-        for note in self.notes:
-            if keyword.lower() in note.title.value.lower() or keyword.lower() in note.text.value.lower():
-                notes.append(note)
-        return [note.format_for_display() for note in notes]
+        return [note.format_for_display() for note in self.search(keyword)]
 
-    @input_error
+    @read_locked
     def show_all_notes(self) -> list:
         """
         Get a list of all notes in the notebook.
@@ -367,9 +685,10 @@ class NoteBook:
             list: List of string representations of all notes.
         """
         note_list = [note.format_for_display() for note in self.notes]
+        metrics.scanned(len(note_list))
         return note_list
     
-    @input_error
+    @write_locked
     def clear_all_notes(self) -> tuple:
         """
         Delete all notes from the notebook.
@@ -377,10 +696,18 @@ class NoteBook:
         Returns:
             tuple: Message confirming that all notes were deleted.
         """
-        self.notes.clear()
+        for note in self._notes.values():
+            note._book = None
+            renders.discard(note)
+        self._source = None
+        self._notes.clear()
+        self._text.clear()
+        self._tags.clear()
+        if self._journal is not None:
+            self._journal.record("clear-notes", None)
         return "All the notes have been deleted.", "success"
     
-    @input_error
+    @read_locked
     def search_by_tag(self, tag: str) -> list:
         """
         Search for notes by tag.
@@ -391,10 +718,16 @@ class NoteBook:
         Returns:
             list: List of string representations of notes containing the tag.
         """
-        results = [note for note in self.notes if tag in note.tags]
-        return [note.format_for_display() for note in results]
+        if self._source is not None and self._source.indexed:
+            # читаються лише нотатки з тегом
+            notes = [self._get(key) for key in self._source.tagged(tag)]
+        else:
+            self._load_all()
+            notes = [self._notes[key] for key in self._tags.get(tag)]
+        metrics.scanned(len(notes))
+        return [note.format_for_display() for note in notes]
     
-    @input_error
+    @read_locked
     def sort_by_tag(self) -> list:
         """
         Sort notes by the number of tags (ascending) and alphabetically by title.
@@ -409,9 +742,10 @@ class NoteBook:
         untagged_sorted = sorted(untagged_notes, key=lambda n: n.title.value.lower())
 
         sorted_notes = tagged_sorted + untagged_sorted
+        metrics.scanned(len(sorted_notes))
         return [note.format_for_display() for note in sorted_notes]
     
-    @input_error
+    @read_locked
     def list_all_tags(self) -> list:
         """
         Return a list of all unique tags in the notebook.
@@ -419,12 +753,21 @@ class NoteBook:
         Returns:
             list: List of tag strings.
         """
-        tags = set()
-        for note in self.notes:
-            tags.update(note.tags)
-        return sorted(tags)
+        self._load_all()
+        return sorted(self._tags.keywords())
+
+    @read_locked
+    def tag_counts(self) -> dict:
+        """
+        Return the number of notes for every tag, sorted by tag.
+
+        Returns:
+            dict: Tag to number of notes.
+        """
+        self._load_all()
+        return {tag: self._tags.count(tag) for tag in sorted(self._tags.keywords())}
     
-    @input_error
+    @write_locked
     def clear_all_tags(self) -> tuple:
         """
         Remove all tags from every note in the notebook.
@@ -432,11 +775,15 @@ class NoteBook:
         Returns:
             tuple: Message indicating success.
         """
-        for note in self.notes:
+        self._load_all()
+        keys = {key for tag in self._tags.keywords() for key in self._tags.get(tag)}
+        for key in keys:
+            note = self._notes[key]
             note.tags.clear()
+            note._touch()
         return "All tags have been removed from all notes.", "success"
     
-    @input_error
+    @write_locked
     def remove_tag_from_all(self, tag: str) -> tuple:
         """
         Remove a specific tag from all notes where it appears.
@@ -447,69 +794,463 @@ class NoteBook:
         Returns:
             tuple: Message indicating how many notes were affected.
         """
-        count = 0
-        for note in self.notes:
-            if tag in note.tags:
-                note.tags.remove(tag)
-                count += 1
+        self._load_all()
+        keys = self._tags.get(tag)
+        for key in keys:
+            note = self._notes[key]
+            del note.tags[tag]
+            note._touch()
+        count = len(keys)
         if count == 0:
             return f"⚠️  Tag 'tag' not found in any note.", "warning"
         return f"Tag '{tag}' remove from {count} note(s).", "success"
 
 
 class AddressBook(UserDict):
-    @input_error
+    # один номер телефону не може належати двом контактам
+    unique_phones = os.environ.get("ASSISTANT_UNIQUE_PHONES") == "1"
+    _journal = None
+    _version = 0
+    _source = None
+    lock = NO_LOCK
+
+    def __init__(self, *args, **kwargs):
+        self._keywords = KeywordIndex()
+        self._birthdays = BirthdayIndex()
+        self._phone_index = KeywordIndex()
+        super().__init__(*args, **kwargs)
+
+    def __getstate__(self):
+        self._load_all()
+        state = self.__dict__.copy()
+        for attr in ("_journal", "_keywords", "_birthdays", "_phone_index", "_source", "_seen", "lock"):
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._keywords = KeywordIndex()
+        self._birthdays = BirthdayIndex()
+        self._phone_index = KeywordIndex()
+        for record in self.data.values():
+            record._book = self
+            self._index(record)
+
+    @write_locked
+    def __setitem__(self, name, record):
+        if self._source is not None:
+            self._seen.add(name)
+        self.data[name] = record
+        record._book = self
+        self._index(record)
+
+    def __missing__(self, name):
+        record = self._read(name)
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def _read(self, name: str) -> Record | None:
+        """Read a record from the snapshot on first access."""
+        if self._source is None or name in self._seen:
+            return None
+        self._seen.add(name)
+        record = self._source.get(name)
+        if record is None:
+            return None
+        self.data[name] = record
+        record._book = self
+        self._index(record)
+        return record
+
+    def __contains__(self, name):
+        if name in self.data:
+            return True
+        return self._source is not None and name not in self._seen and name in self._source
+
+    def __iter__(self):
+        if self._source is None:
+            return iter(self.data)
+        return self._names()
+
+    def __len__(self):
+        if self._source is None:
+            return len(self.data)
+        hidden = sum(1 for name in self._seen if name in self._source)
+        return len(self.data) + len(self._source) - hidden
+
+    @write_locked
+    def __delitem__(self, name):
+        record = self.data.pop(name)
+        record._book = None
+        renders.discard(record)
+        self._keywords.remove(name)
+        self._birthdays.remove(name)
+        self._phone_index.remove(name)
+        self._version += 1
+
+    def enable_locking(self) -> None:
+        """
+        Make the book safe to use from several threads.
+
+        Changes take the write side of a reader/writer lock, scans take the
+        read side and single lookups take no lock at all. Records are read
+        from the snapshot on demand by mutating the book, so the rest of
+        them are loaded first.
+        """
+        self._load_all()
+        self.lock = RWLock()
+
+    def attach_snapshot(self, source) -> None:
+        """
+        Serve records from a snapshot section, reading every record on first access.
+
+        Args:
+            source (SnapshotSection): Snapshot section with the records.
+        """
+        self._source = source
+        self._seen = set()
+
+    def _load_all(self) -> None:
+        """Read the rest of the records from the snapshot, keeping their order."""
+        if self._source is None:
+            return
+        source, self._source = self._source, None
+        names = source.keys()
+        unread = [name for name in names if name not in self.data and name not in self._seen]
+        stored = dict(zip(unread, source.get_many(unread)))
+        data = {}
+        for name in names:
+            if name in self.data:
+                data[name] = self.data[name]
+            elif name in stored:
+                data[name] = stored[name]
+        for name, record in self.data.items():
+            data.setdefault(name, record)
+        loaded, self.data = self.data, data
+        for name, record in data.items():
+            if name not in loaded:
+                record._book = self
+                self._index(record)
+        self._seen = set()
+
+    def _names(self):
+        """Yield names in book order without reading records from the snapshot."""
+        source = self._source
+        for name in source.keys():
+            if name in self.data or name not in self._seen:
+                yield name
+        for name in list(self.data):
+            if name not in source:
+                yield name
+
+    def _stored_items(self):
+        """Yield (name, Record or pickled record) pairs without reading unchanged records."""
+        if self._source is None:
+            yield from self.data.items()
+            return
+        for name in self._names():
+            record = self.data.get(name)
+            yield name, record if record is not None else self._source.raw(name)
+
+    def _index(self, record: Record) -> None:
+        self._version += 1
+        self._keywords.update(record.name.value, record.get_contact_keywords())
+        self._birthdays.update(record.name.value, record.birthday.value if record.birthday else None)
+        self._phone_index.update(record.name.value, record._phones)
+
+    @write_locked
+    def _changed(self, record: Record) -> None:
+        self._index(record)
+        if self._journal is not None:
+            self._journal.record("contact", record.name.value, record)
+
+    @write_locked
     def add_record(self, record):
-        self.data[record.name.value] = record
+        self[record.name.value] = record
+        if self._journal is not None:
+            self._journal.record("contact", record.name.value, record)
         return "Record added.", "success"
 
-    @input_error
-    def find(self, name):
-        return self.data[name.lower()]
+    @write_locked
+    def add_records(self, records: list) -> int:
+        """
+        Add many records at once, replacing records with the same name.
+
+        With unique phones, records with a phone of another contact are skipped.
 
-    @input_error
+        Args:
+            records (list): Record objects.
+
+        Returns:
+            int: Number of added records.
+        """
+        source = self._indexed_source() if self.unique_phones else None
+        if source is not None:
+            return self._add_records_indexed(records, source)
+        added = 0
+        for record in records:
+            if self.phone_conflict(record.name.value, record._phones) is not None:
+                continue
+            self.pop(record.name.value, None)
+            self.add_record(record)
+            added += 1
+        return added
+
+    def _add_records_indexed(self, records: list, source) -> int:
+        """
+        Add records checking unique phones against the source in one query.
+
+        A query per record would write the pending changes every time, so the
+        owners of all phones of the batch are read at once and kept up to date
+        while the records are added.
+        """
+        phones = list({phone for record in records for phone in record.phone_values()})
+        owners, owned = {}, {}
+        for phone, owner in source.phone_owners(phones) if phones else ():
+            owners.setdefault(phone, []).append(owner)
+            owned.setdefault(owner, []).append(phone)
+        added = 0
+        for record in records:
+            name, numbers = record.name.value, record.phone_values()
+            if any(owner != name for phone in numbers for owner in owners.get(phone, ())):
+                continue
+            # замінений контакт звільняє свої старі телефони
+            for phone in owned.pop(name, ()):
+                owners[phone].remove(name)
+            for phone in numbers:
+                owners.setdefault(phone, []).append(name)
+            owned[name] = numbers
+            self.pop(record.name.value, None)
+            self.add_record(record)
+            added += 1
+        return added
+
+    def find_or_none(self, name: str) -> Record | None:
+        """
+        Find a contact by name.
+
+        Misses return None instead of raising, so they cost a dict lookup.
+
+        Args:
+            name (str): Contact name in any case.
+
+        Returns:
+            Record | None: Found record or None.
+        """
+        name = name.lower()
+        record = self.data.get(name)
+        if record is None and self._source is not None:
+            record = self._read(name)
+        return record
+
+    def find(self, name: str):
+        """
+        Find a contact by name, returning a warning on a miss as before find_or_none.
+
+        Args:
+            name (str): Contact name in any case.
+
+        Returns:
+            Record | tuple: Found record, or a warning message tuple.
+        """
+        record = self.find_or_none(name)
+        if record is None:
+            return "No contact with that name.", "warning"
+        return record
+
+    @read_locked
+    def phone_owners(self, phone: str) -> list:
+        """
+        Return names of the contacts with the phone number.
+
+        Args:
+            phone (str): Phone number, separators and the +38 prefix are allowed.
+
+        Returns:
+            list: Contact names, at most one if phones are unique.
+        """
+        number = Phone.pack(phone)
+        if number is None:
+            return []
+        source = self._indexed_source()
+        if source is not None:
+            return [owner for _, owner in source.phone_owners([f"{number:010d}"])]
+        self._load_all()
+        return self._phone_index.get(number)
+
+    def phone_conflict(self, name: str, numbers) -> str | None:
+        """
+        Find another contact that already has one of the phones, if phones must be unique.
+
+        Args:
+            name (str): Name of the contact that gets the phones.
+            numbers: Phones packed with Phone.pack.
+
+        Returns:
+            str | None: Name of the other contact, None if there is no conflict.
+        """
+        if not self.unique_phones:
+            return None
+        source = self._indexed_source()
+        if source is not None:
+            owners = source.phone_owners([f"{number:010d}" for number in numbers])
+            return next((owner for _, owner in owners if owner != name), None)
+        self._load_all()
+        for number in numbers:
+            for owner in self._phone_index.get(number):
+                if owner != name:
+                    return owner
+        return None
+
+    @read_locked
+    def who_is(self, phone: str) -> tuple:
+        """
+        Find the contact with the phone number.
+
+        Args:
+            phone (str): Phone number.
+
+        Returns:
+            tuple: Rows of the found contacts or a warning.
+        """
+        return self._contact_rows(self.phone_owners(phone))
+
+    @read_locked
+    def page(self, start: int, count: int) -> list:
+        """
+        Return records of one page in book order.
+
+        Only the names are walked to the page start, so records before it
+        are not read from the snapshot or the database.
+
+        Args:
+            start (int): Position of the first record.
+            count (int): Page size.
+
+        Returns:
+            list: Up to count records.
+        """
+        source = self._indexed_source()
+        if source is not None:
+            names = source.keys(start, count)
+        else:
+            names = islice(iter(self), start, start + count)
+        return [self[name] for name in names]
+
+    def _indexed_source(self):
+        """Return the lazy source if it answers lookups with its own indexes (SQLite), else None."""
+        source = self._source
+        return source if source is not None and source.indexed else None
+
+    @read_locked
     def find_by_keyword(self, keyword):
-        contacts = []
-        for contact in self.data.values():
-            contact_keywords = contact.get_contact_keywords()
-            if keyword.lower() in contact_keywords:
-                name = contact.name.value.capitalize()
-                phones = "; ".join(p.value for p in contact.phones)
-                birthday = contact.birthday.value.strftime('%d.%m.%Y') if contact.birthday else "-"
-                email = contact.email.value if contact.email else "-"
-                address = contact.address.value if contact.address else "-"
-                contacts.append([name, phones, birthday, email, address])
+        keyword = keyword.lower()
+        source = self._indexed_source()
+        if source is not None:
+            # читаються лише знайдені записи
+            return self._contact_rows(source.find(keyword))
+        self._load_all()
+        return self._contact_rows(self._keywords.get(keyword))
+
+    @read_locked
+    def find_by_prefix(self, prefix: str, limit: int | None = 20) -> tuple:
+        """
+        Find contacts with a name, phone, email or birthday starting with the prefix.
+
+        Args:
+            prefix (str): Beginning of the keyword, e.g. first digits of a phone.
+            limit (int | None): Maximum number of contacts.
 
+        Returns:
+            tuple: Rows of the found contacts or a warning.
+        """
+        self._load_all()
+        return self._contact_rows(self._keywords.startswith(prefix.lower(), limit))
+
+    @read_locked
+    def find_fuzzy(self, keyword: str, max_distance: int | None = None, limit: int | None = 20) -> tuple:
+        """
+        Find contacts with a name or email similar to the keyword, closest first.
+
+        Args:
+            keyword (str): Name or email, possibly misspelled.
+            max_distance (int | None): Maximum number of typos, by default
+                one for every four letters (at least one, at most three).
+            limit (int | None): Maximum number of contacts.
+
+        Returns:
+            tuple: Rows of the found contacts or a warning.
+        """
+        self._load_all()
+        keyword = keyword.lower()
+        if max_distance is None:
+            max_distance = max(1, min(3, len(keyword) // 4))
+        found = self._keywords.similar(keyword, max_distance, limit)
+        return self._contact_rows(name for _, name in found)
+
+    def _contact_rows(self, names) -> tuple:
+        contacts = [self[name].row() for name in names]
+
+        metrics.scanned(len(contacts))
         if contacts:
             return contacts, "table"
         return "No contact found.", "warning"
 
-    @input_error
+    @write_locked
     def delete(self, name):
-        self.data.pop(name.lower())
+        record = self.find_or_none(name)
+        if record is None:
+            return "No contact with that name.", "warning"
+        del self[record.name.value]
+        if self._journal is not None:
+            self._journal.record("contact", record.name.value, None)
         return "Record deleted.", "success"
 
-    @input_error
+    @read_locked
     def get_upcoming_birthdays(self, days: int = 7) -> (list, str):
+        """
+        Get contacts with a birthday in the next days.
+
+        Congratulation dates that fall on a weekend are moved to Monday.
+        Birthdays on February 29 are celebrated on March 1 in non-leap years.
+
+        Args:
+            days (int): Number of days to look ahead.
+
+        Returns:
+            tuple: List of [name, congratulation date] rows.
+        """
+        from calendar import isleap  # calendar тягне за собою locale, тож не імпортуємо його при старті
+
+        source = self._indexed_source()
+        if source is None:
+            self._load_all()
+        born_on = self._birthdays.get if source is None else source.born_on
         today = dtdt.now().date()
-        d7 = today + timedelta(days=days)
-        lst = [f"Next {days} days You need to congratulate:"]
-        for user in self.data.values():
-            if user.birthday is None:
+        rows = []
+        seen = set()
+        for offset in range(1, min(days, 366) + 1):
+            day = today + timedelta(days=offset)
+            names = born_on(day.month, day.day)
+            if day.month == 3 and day.day == 1 and not isleap(day.year):
+                names = born_on(2, 29) + names
+            if not names:
                 continue
-            bday = user.birthday.value.replace(year=today.year)
-            if bday <= today:
-                bday = bday.replace(year=today.year + 1)
-            if today <= bday <= d7:
-                if bday.weekday() == 5:
-                    bday = bday + timedelta(days=2)
-                if bday.weekday() == 6:
-                    bday = bday + timedelta(days=1)
-                user_bday = f"{user.name.value.capitalize()}: {dtdt.strftime(bday, '%d.%m.%Y')}"
-                lst.append(user_bday)
-        return lst, "common list"
-
-    @input_error
+            metrics.scanned(len(names))
+            congrats = day
+            if congrats.weekday() == 5:
+                congrats = congrats + timedelta(days=2)
+            if congrats.weekday() == 6:
+                congrats = congrats + timedelta(days=1)
+            for name in names:
+                if name in seen:
+                    continue
+                seen.add(name)
+                rows.append([self[name].name.value.capitalize(), dtdt.strftime(congrats, '%d.%m.%Y')])
+        return rows, "birthdays"
+
+    @write_locked
     def clear_all_contacts(self) -> tuple:
         """
         Delete all contacts from the addressbook.
@@ -517,5 +1258,15 @@ class AddressBook(UserDict):
         Returns:
             tuple: Message confirming that all notes were deleted.
         """
+        for record in self.data.values():
+            record._book = None
+            renders.discard(record)
+        self._source = None
         self.data.clear()
+        self._keywords.clear()
+        self._birthdays.clear()
+        self._phone_index.clear()
+        self._version += 1
+        if self._journal is not None:
+            self._journal.record("clear-contacts", None)
         return "All the contacts have been deleted.", "success"
@@ -0,0 +1,49 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered objects (note texts, contact table rows).
+
+    Entries are keyed by the object itself and dropped by its mutators, so a
+    hit is always up to date. Once ``maxsize`` entries are stored, the least
+    recently used one is evicted.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, obj):
+        """Return the cached rendering of the object, or None."""
+        with self._lock:
+            value = self._data.get(obj)
+            if value is not None:
+                self._data.move_to_end(obj)
+            return value
+
+    def put(self, obj, value) -> None:
+        with self._lock:
+            self._data[obj] = value
+            self._data.move_to_end(obj)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, obj) -> None:
+        """Forget the rendering of a changed or deleted object."""
+        with self._lock:
+            self._data.pop(obj, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# Спільний кеш нотаток і рядків контактів; розмір можна змінити змінною середовища
+renders = RenderCache(int(os.environ.get("ASSISTANT_RENDER_CACHE", 20000)))
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+from contextlib import asynccontextmanager
+
+import commands
+import metrics
+from assistant import load_data, save_data, parse_line, run_scripted, render
+from ui_helpers import main_user_input, output
+
+
+DEFAULT_ADDRESS = "data/assistant.sock"
+
+
+def parse_address(address: str) -> tuple:
+    """
+    Split an address into ("unix", path) or ("tcp", (host, port)).
+
+    "host:port" and ":port" are TCP addresses, anything else is a Unix socket path.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return "tcp", (host or "127.0.0.1", int(port))
+    return "unix", address
+
+
+class AsyncRWLock:
+    """
+    Reader/writer lock for coroutines.
+
+    Any number of readers can hold it together, a writer holds it alone.
+    Waiting writers block new readers, so a stream of reads cannot starve them.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            await self._cond.wait_for(lambda: not self._writer and not self._readers)
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class CommandServer:
+    """
+    Serve the command handlers of one in-memory AddressBook/NoteBook pair.
+
+    Line protocol: the client sends a command line, the server answers with one
+    JSON line like the batch mode, plus "messages" printed by the command as
+    uncolored {"text", "type"} objects.
+    Read-only commands run on a thread pool next to each other; commands that
+    change the books run one at a time and are written to the journal at once.
+    """
+
+    def __init__(self, addressbook, notebook):
+        self.addressbook = addressbook
+        self.notebook = notebook
+        self.lock = AsyncRWLock()
+        addressbook.enable_locking()
+        notebook.enable_locking()
+
+    def _run(self, command: list, write: bool) -> dict:
+        messages = []
+        report = run_scripted(command, self.addressbook, self.notebook, messages)
+        if write:
+            save_data((self.addressbook, self.notebook))
+        if messages:
+            report["messages"] = messages
+        return report
+
+    async def execute(self, command: list) -> dict:
+        cmd = commands.get(command[0])
+        write = cmd is None or not cmd.readonly
+        loop = asyncio.get_running_loop()
+        async with (self.lock.write() if write else self.lock.read()):
+            try:
+                return await loop.run_in_executor(None, self._run, command, write)
+            except Exception as e:
+                # помилка в одній команді не повинна обривати з'єднання
+                return {"command": command[0], "status": "error", "result": f"Command failed: {e!r}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                command = parse_line(line.decode("utf-8"))
+                if command is None:
+                    continue
+                cmd = commands.get(command[0])
+                if cmd is not None and cmd.output == "exit":
+                    break
+                report = await self.execute(command)
+                writer.write(json.dumps(report, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str = DEFAULT_ADDRESS) -> None:
+        kind, where = parse_address(address)
+        if kind == "tcp":
+            server = await asyncio.start_server(self.handle, *where)
+        else:
+            os.makedirs(os.path.dirname(where) or ".", exist_ok=True)
+            if os.path.exists(where):
+                os.remove(where)
+            server = await asyncio.start_unix_server(self.handle, where)
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, lambda: stopped.done() or stopped.set_result(None))
+            except NotImplementedError:
+                # Windows: Ctrl+C завершить сервер через KeyboardInterrupt
+                pass
+        async with server:
+            await stopped
+        if kind == "unix":
+            os.remove(where)
+
+
+def run_server(address: str = DEFAULT_ADDRESS, metrics_file: str | None = None) -> None:
+    """Load the data once and serve it until interrupted, writing the statistics to metrics_file if given."""
+    if metrics_file:
+        metrics.enable()
+    addressbook, notebook = load_data()
+    server = CommandServer(addressbook, notebook)
+    print(f"Serving on {address}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        addressbook._journal.close()
+        if metrics_file:
+            metrics.dump(metrics_file)
+
+
+def connect(address: str = DEFAULT_ADDRESS) -> socket.socket:
+    kind, where = parse_address(address)
+    if kind == "tcp":
+        return socket.create_connection(where)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(where)
+    return sock
+
+
+def run_client(address: str = DEFAULT_ADDRESS) -> None:
+    """Read commands like the interactive assistant and run them on the server."""
+    with connect(address) as sock, sock.makefile("rwb") as stream:
+        while True:
+            command = main_user_input()
+            if not command or not command[0]:
+                continue
+            cmd = commands.get(command[0].lower())
+            if cmd is not None and cmd.output == "exit":
+                output("Good bye!", "info")
+                break
+            stream.write(" ".join(command).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+            if not line:
+                output("Server closed the connection.", "error")
+                break
+            report = json.loads(line)
+            for message in report.get("messages", ()):
+                output(message["text"], message["type"])
+            result = (report["result"], report["status"]) + ((report["footer"],) if "footer" in report else ())
+            if cmd is None:
+                output(*result)
+            else:
+                render(cmd, result)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Share one address book and notebook between many sessions.")
+    parser.add_argument("address", nargs="?", default=DEFAULT_ADDRESS,
+                        help=f"Unix socket path or [host]:port (default {DEFAULT_ADDRESS})")
+    parser.add_argument("--connect", action="store_true", help="run the client instead of the server")
+    parser.add_argument("--metrics", metavar="FILE", help="time book methods and write the statistics to FILE at exit")
+    options = parser.parse_args()
+    if options.connect:
+        run_client(options.address)
+    else:
+        run_server(options.address, options.metrics)
@@ -0,0 +1,158 @@
+import mmap
+import struct
+
+
+MAGIC = b"ABNBSNP1"
+HEADER = struct.Struct("<8sQQQQQQ")
+ENTRY = struct.Struct("<QIQI")
+ORDER = struct.Struct("<Q")
+
+
+def pickler():
+    """Return the pickle module; it is imported on the first save or load, not at startup."""
+    import pickle
+    return pickle
+
+
+def is_snapshot(filename: str) -> bool:
+    """Check whether the file is in the binary snapshot format."""
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def dump(contacts, notes) -> bytes:
+    """
+    Build a snapshot from two sections.
+
+    Layout: header; for every section a table of (key offset, key length,
+    object offset, object length) entries sorted by key and the table positions
+    in the original order; then the keys and pickled objects.
+
+    Args:
+        contacts: Iterable of (name, Record or pickled bytes) in book order.
+        notes: Iterable of (title key, Note or pickled bytes) in notebook order.
+
+    Returns:
+        bytes: Snapshot data.
+    """
+    sections = [_collect(contacts), _collect(notes)]
+    offset = HEADER.size
+    tables = []
+    for items in sections:
+        table_off = offset
+        order_off = table_off + len(items) * ENTRY.size
+        offset = order_off + len(items) * ORDER.size
+        tables.append((table_off, order_off))
+
+    header, meta, pools = [], [], []
+    for items, (table_off, order_off) in zip(sections, tables):
+        positions = []
+        for raw_key, blob in items:
+            positions.append((offset, len(raw_key), offset + len(raw_key), len(blob)))
+            pools += [raw_key, blob]
+            offset += len(raw_key) + len(blob)
+        by_key = sorted(range(len(items)), key=lambda i: items[i][0])
+        rank = [0] * len(items)
+        for n, i in enumerate(by_key):
+            rank[i] = n
+        meta.append(b"".join(ENTRY.pack(*positions[i]) for i in by_key))
+        meta.append(b"".join(ORDER.pack(n) for n in rank))
+        header += [len(items), table_off, order_off]
+    return b"".join([HEADER.pack(MAGIC, *header), *meta, *pools])
+
+
+def _collect(items) -> list:
+    pickle = pickler()
+    collected = []
+    for key, obj in items:
+        if not isinstance(obj, bytes):
+            obj = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        collected.append((key.encode("utf-8"), obj))
+    return collected
+
+
+class Snapshot:
+    """
+    Read-only memory-mapped snapshot.
+
+    Nothing is unpickled on open: lookups binary-search the sorted entry table
+    and only the pages of the requested objects are read.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, *fields = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a snapshot")
+        self.contacts = SnapshotSection(self._mm, *fields[:3])
+        self.notes = SnapshotSection(self._mm, *fields[3:])
+
+    def close(self) -> None:
+        """Unmap the file; the sections cannot be read afterwards."""
+        self._mm.close()
+
+
+class SnapshotSection:
+    # лише ключі й значення: пошук за ключовими словами потребує всіх записів
+    indexed = False
+
+    def __init__(self, mm, count: int, table_off: int, order_off: int):
+        self._mm = mm
+        self._count = count
+        self._table_off = table_off
+        self._order_off = order_off
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, i: int) -> tuple:
+        return ENTRY.unpack_from(self._mm, self._table_off + i * ENTRY.size)
+
+    def _key(self, i: int) -> bytes:
+        key_off, key_len, _, _ = self._entry(i)
+        return self._mm[key_off:key_off + key_len]
+
+    def _find(self, key: str) -> int | None:
+        raw_key = key.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < raw_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == raw_key:
+            return lo
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def raw(self, key: str) -> bytes | None:
+        """Return the pickled object stored under the key."""
+        i = self._find(key)
+        if i is None:
+            return None
+        _, _, blob_off, blob_len = self._entry(i)
+        return self._mm[blob_off:blob_off + blob_len]
+
+    def get(self, key: str):
+        """Return the object stored under the key, or None."""
+        blob = self.raw(key)
+        return None if blob is None else pickler().loads(blob)
+
+    def get_many(self, keys: list) -> list:
+        """Return the objects stored under the keys."""
+        return [self.get(key) for key in keys]
+
+    def keys(self) -> list:
+        """Return all keys in the original order."""
+        keys = []
+        for n in range(self._count):
+            (i,) = ORDER.unpack_from(self._mm, self._order_off + n * ORDER.size)
+            keys.append(self._key(i).decode("utf-8"))
+        return keys
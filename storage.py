@@ -0,0 +1,593 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import snapshot
+from models import parse_date
+from record import AddressBook, NoteBook
+
+
+DATA_FILE = "data/addressbook_and_notebook.pkl"
+SQLITE_FILE = "data/addressbook_and_notebook.db"
+
+
+class Storage(ABC):
+    """
+    Base class for storage backends.
+
+    The books report every change through ``record``; the backend writes the
+    collected changes on ``flush``. Both can be called from several threads.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.pending = {}
+        self.books = None
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def load(self) -> tuple:
+        """Read the books and attach them to the storage."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Write the changes recorded since the last flush."""
+
+    def compact(self, wait: bool = False) -> None:
+        self.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def sync(self) -> None:
+        """Write pending changes and wait for background work to finish."""
+        self.flush()
+
+    def attach(self, addressbook: AddressBook, notebook: NoteBook) -> None:
+        self.books = addressbook, notebook
+        addressbook._journal = self
+        notebook._journal = self
+
+    def record(self, kind: str, key, obj=None) -> None:
+        """
+        Remember a change to be written on the next flush.
+
+        The books report changes while holding their write lock, so the object
+        is serialized here: flush then writes bytes and never reads an object
+        that another thread may be changing.
+
+        Args:
+            kind (str): "contact", "note", "clear-contacts" or "clear-notes".
+            key: Contact name or note title (None for clear operations).
+            obj: Changed object, or None if it was deleted.
+        """
+        change = self._serialize(kind, key, obj)
+        with self._lock:
+            if kind.startswith("clear-"):
+                target = kind[len("clear-"):-1]
+                self.pending = {k: v for k, v in self.pending.items() if k[0] != target}
+            self.pending[(kind, key)] = change
+
+    @abstractmethod
+    def _serialize(self, kind: str, key, obj):
+        """Turn a change into what flush writes."""
+
+    def _take_pending(self) -> dict:
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+
+class JournalStorage(Storage):
+    """
+    Append-only journal on top of a snapshot.
+
+    Every change reported by the books is appended to the journal as a small
+    ``(kind, key, obj)`` record, so a save costs O(changes). From time to time
+    the journal is folded into a fresh snapshot by a background thread.
+    """
+
+    compact_every = 1000
+
+    def __init__(self, filename: str = DATA_FILE):
+        super().__init__(filename)
+        self.journal_file = filename + ".journal"
+        self.old_journal_file = filename + ".journal.old"
+        self.next_file = filename + ".next"
+        self.entries = 0
+        self._file = None
+        self._compactor = None
+        self._compacting = threading.RLock()
+
+    def load(self) -> tuple:
+        """
+        Load the snapshot and replay the journal on top of it.
+
+        Returns:
+            tuple: AddressBook and NoteBook.
+        """
+        self._promote_next()
+        if snapshot.is_snapshot(self.filename):
+            # записи читаються з відображеного файлу лише при першому зверненні
+            snap = snapshot.Snapshot(self.filename)
+            addressbook, notebook = AddressBook(), NoteBook()
+            addressbook.attach_snapshot(snap.contacts)
+            notebook.attach_snapshot(snap.notes)
+        else:
+            try:
+                with open(self.filename, "rb") as f:
+                    addressbook, notebook = snapshot.pickler().load(f)
+            except FileNotFoundError:
+                addressbook, notebook = AddressBook(), NoteBook()
+
+        interrupted = os.path.exists(self.old_journal_file)
+        if interrupted:
+            self._replay(self.old_journal_file, addressbook, notebook)
+        self.entries = self._replay(self.journal_file, addressbook, notebook)
+        self.attach(addressbook, notebook)
+        if interrupted:
+            # попереднє ущільнення не завершилось, тож починаємо його знову
+            self.compact()
+        return addressbook, notebook
+
+    def _serialize(self, kind: str, key, obj) -> bytes:
+        # запис журналу готовий одразу, flush лише дописує байти
+        pickle = snapshot.pickler()
+        return pickle.dumps((kind, key, obj), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def flush(self) -> None:
+        """Append pending changes to the journal."""
+        with self._lock:
+            self._append(self._take_pending())
+            full = self.entries >= self.compact_every
+        if full:
+            self.compact()
+
+    def _append(self, pending: dict) -> None:
+        if not pending:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            self._file = open(self.journal_file, "ab")
+        self._file.write(b"".join(pending.values()))
+        self._file.flush()
+        self.entries += len(pending)
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Fold the journal into a new snapshot.
+
+        Here the journal is only closed and set aside under the storage lock;
+        a background thread merges it into the previous snapshot (unchanged
+        records are copied as they are) without touching the live books.
+        ``wait`` runs the merge on the calling thread instead.
+        """
+        with self._compacting:
+            self._join()
+            with self._lock:
+                self._append(self._take_pending())
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._retire_journal()
+                self.entries = 0
+            if wait:
+                self._fold()
+            else:
+                self._compactor = threading.Thread(target=self._fold, daemon=True)
+                self._compactor.start()
+
+    def save_books(self) -> None:
+        """Write the attached books to a new snapshot as they are now, e.g. books that were not loaded from here."""
+        with self._compacting:
+            self._join()
+            addressbook, notebook = self.books
+            with addressbook.lock.read(), notebook.lock.read():
+                data = snapshot.dump(addressbook._stored_items(), notebook._stored_items())
+                with self._lock:
+                    self.pending = {}
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    self._retire_journal()
+                    self.entries = 0
+            self._write_snapshot(data)
+
+    def close(self) -> None:
+        """
+        Write pending changes and make the journal durable.
+
+        No snapshot is written at exit; a compaction that is already running
+        is allowed to finish, so the next start does not have to redo it.
+        """
+        with self._lock:
+            self._append(self._take_pending())
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+        self._join()
+
+    def sync(self) -> None:
+        self.flush()
+        self._join()
+
+    def _join(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _retire_journal(self) -> None:
+        """Move the journal aside for the next fold, after a journal left by an unfinished one."""
+        if not os.path.exists(self.journal_file):
+            return
+        if not os.path.exists(self.old_journal_file):
+            os.replace(self.journal_file, self.old_journal_file)
+            return
+        with open(self.journal_file, "rb") as src, open(self.old_journal_file, "ab") as dst:
+            dst.write(src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_file)
+
+    def _fold(self) -> None:
+        """Merge the set-aside journal into the previous snapshot and write the result."""
+        if not os.path.exists(self.old_journal_file) and (
+                os.path.exists(self.next_file) or snapshot.is_snapshot(self.filename)):
+            return
+        contacts, notes = self._stored_sections()
+        pickle = snapshot.pickler()
+        for kind, key, obj in self._entries(self.old_journal_file):
+            if kind == "contact":
+                section, key = contacts, key
+            elif kind == "note":
+                section, key = notes, NoteBook._key(key)
+            else:
+                (contacts if kind == "clear-contacts" else notes).clear()
+                continue
+            if obj is None:
+                section.pop(key, None)
+            else:
+                # нові ключі додаються в кінець, змінені лишаються на своєму місці, як у книгах
+                section[key] = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_snapshot(snapshot.dump(contacts.items(), notes.items()))
+
+    def _stored_sections(self) -> tuple:
+        """Read the previous snapshot (or an old whole-pickle file) as two ordered {key: pickled object} dicts."""
+        # знімок, що чекає заміни старого, новіший за нього
+        for filename in (self.next_file, self.filename):
+            if snapshot.is_snapshot(filename):
+                snap = snapshot.Snapshot(filename)
+                try:
+                    return ({key: snap.contacts.raw(key) for key in snap.contacts.keys()},
+                            {key: snap.notes.raw(key) for key in snap.notes.keys()})
+                finally:
+                    snap.close()
+        try:
+            with open(self.filename, "rb") as f:
+                addressbook, notebook = snapshot.pickler().load(f)
+        except FileNotFoundError:
+            return {}, {}
+        return dict(addressbook._stored_items()), dict(notebook._stored_items())
+
+    def _write_snapshot(self, data: bytes) -> None:
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        tmp_file = self.filename + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.replace(tmp_file, self.filename)
+        except PermissionError:
+            # Windows не дає замінити файл, поки книги читають його через mmap:
+            # новий знімок лягає поруч і займає місце старого при наступному запуску
+            os.replace(tmp_file, self.next_file)
+        else:
+            if os.path.exists(self.next_file):
+                os.remove(self.next_file)
+        if os.path.exists(self.old_journal_file):
+            os.remove(self.old_journal_file)
+
+    def _promote_next(self) -> None:
+        """Put a snapshot written beside a mapped one in its place before it is mapped again."""
+        if os.path.exists(self.next_file):
+            os.replace(self.next_file, self.filename)
+
+    @staticmethod
+    def _entries(filename: str):
+        """Yield (kind, key, obj) records of a journal file, stopping at a torn last record."""
+        try:
+            f = open(filename, "rb")
+        except FileNotFoundError:
+            return
+        pickle = snapshot.pickler()
+        with f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    # обірваний запис у кінці журналу після збою
+                    return
+
+    @classmethod
+    def _replay(cls, filename: str, addressbook: AddressBook, notebook: NoteBook) -> int:
+        count = 0
+        for kind, key, obj in cls._entries(filename):
+            apply_change(addressbook, notebook, kind, key, obj)
+            count += 1
+        return count
+
+
+class SQLiteStorage(Storage):
+    """
+    SQLite backend.
+
+    Each contact and note is stored in its own row next to indexed columns
+    (name, phone, email, birthday month/day, note title and tags), so changes
+    are written as row upserts. Nothing is read on load: the books get the
+    tables as lazy sources, read rows on first access and answer lookups
+    with index queries until something needs all of the records.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS contacts (
+            name TEXT PRIMARY KEY,
+            email TEXT,
+            bday_month INTEGER,
+            bday_day INTEGER,
+            bday_year INTEGER,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS contacts_email ON contacts (email);
+        CREATE INDEX IF NOT EXISTS contacts_birthday ON contacts (bday_month, bday_day);
+        CREATE TABLE IF NOT EXISTS phones (
+            phone TEXT NOT NULL,
+            name TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+        CREATE INDEX IF NOT EXISTS phones_name ON phones (name);
+        CREATE TABLE IF NOT EXISTS notes (
+            title_key TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS note_tags (
+            tag TEXT NOT NULL,
+            title_key TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags (tag);
+        CREATE INDEX IF NOT EXISTS note_tags_title ON note_tags (title_key);
+    """
+
+    def __init__(self, filename: str = SQLITE_FILE):
+        import sqlite3
+        super().__init__(filename)
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        # з'єднання використовується з різних потоків, тому доступ до нього йде під self._lock
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.executescript(self.schema)
+
+    def load(self) -> tuple:
+        """
+        Attach the tables to empty books; rows are read when they are first needed.
+
+        Returns:
+            tuple: AddressBook and NoteBook.
+        """
+        addressbook, notebook = AddressBook(), NoteBook()
+        addressbook.attach_snapshot(ContactRows(self))
+        notebook.attach_snapshot(NoteRows(self))
+        self.attach(addressbook, notebook)
+        return addressbook, notebook
+
+    def flush(self) -> None:
+        """Write pending changes in a single transaction."""
+        with self._lock:
+            pending = self._take_pending()
+            if pending:
+                self._write(pending)
+
+    def _serialize(self, kind: str, key, obj):
+        """Column values of the changed row, None for a deleted row or a clear."""
+        if obj is None:
+            return None
+        pickle = snapshot.pickler()
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        if kind == "note":
+            return data, list(obj.tags)
+        bday = obj.birthday.value if obj.birthday else None
+        return (obj.email.value if obj.email else None,
+                bday.month if bday else None, bday.day if bday else None, bday.year if bday else None,
+                data, obj.phone_values())
+
+    def _write(self, pending: dict) -> None:
+        with self.conn:
+            for (kind, key), row in pending.items():
+                if kind == "contact":
+                    self._save_contact(key, row)
+                elif kind == "note":
+                    self._save_note(key, row)
+                elif kind == "clear-contacts":
+                    self.conn.execute("DELETE FROM phones")
+                    self.conn.execute("DELETE FROM contacts")
+                elif kind == "clear-notes":
+                    self.conn.execute("DELETE FROM note_tags")
+                    self.conn.execute("DELETE FROM notes")
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+    def _save_contact(self, name: str, row) -> None:
+        self.conn.execute("DELETE FROM phones WHERE name = ?", (name,))
+        if row is None:
+            self.conn.execute("DELETE FROM contacts WHERE name = ?", (name,))
+            return
+        *columns, phones = row
+        self.conn.execute(
+            "INSERT INTO contacts (name, email, bday_month, bday_day, bday_year, data) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET email = excluded.email, bday_month = excluded.bday_month, "
+            "bday_day = excluded.bday_day, bday_year = excluded.bday_year, data = excluded.data",
+            (name, *columns))
+        self.conn.executemany("INSERT INTO phones (phone, name) VALUES (?, ?)", [(phone, name) for phone in phones])
+
+    def _save_note(self, title: str, row) -> None:
+        # той самий ключ, за яким NoteBook шукає нотатки
+        title_key = NoteBook._key(title)
+        self.conn.execute("DELETE FROM note_tags WHERE title_key = ?", (title_key,))
+        if row is None:
+            self.conn.execute("DELETE FROM notes WHERE title_key = ?", (title_key,))
+            return
+        data, tags = row
+        self.conn.execute(
+            "INSERT INTO notes (title_key, title, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (title_key) DO UPDATE SET title = excluded.title, data = excluded.data",
+            (title_key, title, data))
+        self.conn.executemany("INSERT INTO note_tags (tag, title_key) VALUES (?, ?)",
+                              [(tag, title_key) for tag in tags])
+
+    def query(self, query: str, params=()) -> list:
+        """Write pending changes and run a query on the up-to-date tables."""
+        self.flush()
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+
+class SQLiteRows:
+    """
+    Table of a SQLiteStorage served to a book like a snapshot section.
+
+    Pending changes are written before every query, so the rows always match
+    the books. ``indexed`` tells the book that the rows can also answer
+    lookups by keyword, birthday or tag without reading every record.
+    """
+
+    indexed = True
+    table = key_column = None
+
+    def __init__(self, storage: SQLiteStorage):
+        self.storage = storage
+
+    def __len__(self):
+        return self.storage.query(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.storage.query(f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ?", (key,)))
+
+    def raw(self, key: str) -> bytes | None:
+        """Return the pickled object stored under the key."""
+        rows = self.storage.query(f"SELECT data FROM {self.table} WHERE {self.key_column} = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def get(self, key: str):
+        """Return the object stored under the key, or None."""
+        blob = self.raw(key)
+        return None if blob is None else snapshot.pickler().loads(blob)
+
+    def get_many(self, keys: list) -> list:
+        """Return the objects stored under the keys, reading the table in one query."""
+        loads = snapshot.pickler().loads
+        blobs = dict(self.storage.query(f"SELECT {self.key_column}, data FROM {self.table}"))
+        return [loads(blobs[key]) if key in blobs else None for key in keys]
+
+    def keys(self, offset: int = 0, limit: int | None = None) -> list:
+        """Return keys in insertion order, all of them or the slice from offset."""
+        return [key for (key,) in self.storage.query(
+            f"SELECT {self.key_column} FROM {self.table} ORDER BY rowid LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset))]
+
+
+class ContactRows(SQLiteRows):
+    table, key_column = "contacts", "name"
+
+    def find(self, keyword: str) -> list:
+        """
+        Find contact names by name, phone, email or birthday (DD.MM.YYYY).
+
+        Args:
+            keyword (str): Lowercase keyword to look up.
+
+        Returns:
+            list: Names of the matching contacts in book order.
+        """
+        query = ("SELECT name FROM contacts WHERE name = :kw OR email = :kw "
+                 "OR name IN (SELECT name FROM phones WHERE phone = :kw)")
+        params = {"kw": keyword}
+        bday = parse_date(keyword)
+        # ключове слово має збігатися з датою так само, як у KeywordIndex
+        if bday is not None and bday.strftime("%d.%m.%Y") == keyword:
+            query += " OR (bday_month = :m AND bday_day = :d AND bday_year = :y)"
+            params.update(m=bday.month, d=bday.day, y=bday.year)
+        return [name for (name,) in self.storage.query(query + " ORDER BY rowid", params)]
+
+    def phone_owners(self, phones: list) -> list:
+        """
+        Find the contacts that have any of the phones.
+
+        Args:
+            phones (list): Phones as 10-digit strings.
+
+        Returns:
+            list: (phone, contact name) pairs in book order.
+        """
+        marks = ", ".join("?" * len(phones))
+        return self.storage.query(
+            f"SELECT phones.phone, phones.name FROM phones JOIN contacts USING (name) "
+            f"WHERE phones.phone IN ({marks}) ORDER BY contacts.rowid", phones)
+
+    def born_on(self, month: int, day: int) -> list:
+        """Return names of contacts born on the given month and day in book order."""
+        return [name for (name,) in self.storage.query(
+            "SELECT name FROM contacts WHERE bday_month = ? AND bday_day = ? ORDER BY rowid", (month, day))]
+
+
+class NoteRows(SQLiteRows):
+    table, key_column = "notes", "title_key"
+
+    def tagged(self, tag: str) -> list:
+        """Return keys of the notes that have the tag in notebook order."""
+        return [key for (key,) in self.storage.query(
+            "SELECT notes.title_key FROM note_tags JOIN notes USING (title_key) WHERE note_tags.tag = ? "
+            "ORDER BY notes.rowid", (tag,))]
+
+
+BACKENDS = {
+    "journal": (JournalStorage, DATA_FILE),
+    "sqlite": (SQLiteStorage, SQLITE_FILE),
+}
+
+
+def open_storage(backend: str | None = None, filename: str | None = None) -> Storage:
+    """
+    Create a storage backend.
+
+    Args:
+        backend (str | None): "journal" or "sqlite", defaults to $ASSISTANT_STORAGE or "journal".
+        filename (str | None): Data file, defaults to the backend's own file.
+
+    Returns:
+        Storage: Storage backend.
+    """
+    backend = backend or os.environ.get("ASSISTANT_STORAGE", "journal")
+    storage_class, default_file = BACKENDS[backend]
+    return storage_class(filename or default_file)
+
+
+def apply_change(addressbook: AddressBook, notebook: NoteBook, kind: str, key, obj) -> None:
+    """Apply one journal record to the books; a changed record keeps its place, as it did in the book."""
+    if kind == "contact":
+        if obj is None:
+            addressbook.pop(key, None)
+        else:
+            addressbook.add_record(obj)
+    elif kind == "note":
+        if obj is None:
+            notebook.delete_note(key)
+        else:
+            notebook.put_note(obj)
+    elif kind == "clear-contacts":
+        addressbook.clear_all_contacts()
+    elif kind == "clear-notes":
+        notebook.clear_all_notes()
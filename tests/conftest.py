@@ -0,0 +1,23 @@
+import os
+import sys
+
+# модулі лежать у корені репозиторію, а не в пакеті
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record import Note, Record  # noqa: E402
+
+
+def make_contact(name: str, *phones) -> Record:
+    record = Record(name)
+    for phone in phones:
+        record.add_phone(phone)
+    return record
+
+
+def make_note(title: str, text: str, *tags) -> Note:
+    note = Note()
+    note.add_title(title)
+    note.add_text(text)
+    for tag in tags:
+        note.add_tag(tag)
+    return note
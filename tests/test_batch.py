@@ -0,0 +1,41 @@
+import io
+import json
+import sys
+
+import assistant
+from record import AddressBook, NoteBook
+
+
+def reports(capsys) -> list:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_batch_prints_one_report_per_command(capsys):
+    source = io.StringIO('hello\n\nadd-contact bob 0501234567\nadd-note Plans "buy milk" n\nexit\nhello\n')
+    assistant.run_batch(source, AddressBook(), NoteBook())
+    lines = reports(capsys)
+    # порожній рядок пропускається, після exit команди не виконуються
+    assert [(report["line"], report["command"], report["status"]) for report in lines] == [
+        (1, "hello", "info"), (3, "add-contact", "success"), (4, "add-note", "success")]
+
+
+def test_failing_command_is_reported_and_changes_are_saved(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    commands_file = tmp_path / "commands.txt"
+    commands_file.write_text("add-contact bob 0501234567\nhello\nadd-contact ann 0671234567\n", encoding="utf-8")
+    execute = assistant.execute
+
+    def failing_execute(command, addressbook, notebook):
+        if command[0] == "hello":
+            raise RuntimeError("broken handler")
+        return execute(command, addressbook, notebook)
+
+    monkeypatch.setattr(assistant, "execute", failing_execute)
+    monkeypatch.setattr(sys, "argv", ["assistant.py", "--batch", str(commands_file)])
+    assistant.main()
+
+    lines = reports(capsys)
+    assert [report["status"] for report in lines] == ["success", "error", "success"]
+    assert lines[1] == {"line": 2, "command": "hello", "status": "error", "result": "RuntimeError: broken handler"}
+    addressbook, _ = assistant.load_data()
+    assert sorted(addressbook) == ["ann", "bob"]
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import commands
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # тестові команди не потрапляють у справжній реєстр
+    monkeypatch.setattr(commands, "_commands", dict(commands._commands))
+
+
+def test_handler_module_is_imported_on_first_run(registry, tmp_path, monkeypatch):
+    (tmp_path / "lazy_handlers.py").write_text("def greet(args):\n    return f'hi {args[0]}', 'info'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    cmd = commands.register("greet", "lazy_handlers:greet", commands.GENERAL, "Greet", arity=1,
+                            aliases=("hi",))
+    assert "lazy_handlers" not in sys.modules
+    assert commands.get("hi") is cmd
+    assert ("greet / hi", "Greet") in commands.help_sections()[commands.GENERAL]
+    assert "lazy_handlers" not in sys.modules
+
+    assert cmd.run(["bob"], None, None) == ("hi bob", "info")
+    assert "lazy_handlers" in sys.modules
+    assert cmd.handler is sys.modules["lazy_handlers"].greet
+    monkeypatch.delitem(sys.modules, "lazy_handlers")
+
+
+def test_arguments_are_checked_before_the_handler_runs(registry):
+    calls = []
+
+    def parse_number(args):
+        return [int(args[0])]
+
+    @commands.command("double", commands.GENERAL, "Double a number", arity=1, parser=parse_number)
+    def double(args):
+        calls.append(args)
+        return args[0] * 2, "info"
+
+    cmd = commands.get("double")
+    assert cmd.run([], None, None) == ("Invalid command.", "error")
+    assert cmd.run(["x"], None, None)[1] == "error"
+    assert cmd.run(["21"], None, None) == (42, "info")
+    assert calls == [[21]]
+
+
+def test_rarely_used_modules_are_not_imported_at_startup():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import sys, assistant, commands; "
+            "print(commands.get('import-contacts') is not None, "
+            "[name for name in ('bulk_commands', 'contacts_io', 'notes_io') if name in sys.modules])")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "True []"
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from concurrency import RWLock
+from conftest import make_contact
+from record import AddressBook
+from storage import JournalStorage, SQLiteStorage
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def read():
+        with lock.read():
+            # бар'єр пройдуть лише читачі, що тримають замок одночасно
+            inside.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not inside.broken
+
+
+def test_writer_excludes_readers():
+    lock = RWLock()
+    events = []
+
+    def read():
+        with lock.read():
+            events.append("read")
+
+    lock.acquire_write()
+    reader = threading.Thread(target=read)
+    reader.start()
+    time.sleep(0.05)
+    events.append("write done")
+    lock.release_write()
+    reader.join(5)
+    assert events == ["write done", "read"]
+
+
+def test_locks_are_reentrant_and_cannot_be_upgraded():
+    lock = RWLock()
+    with lock.write(), lock.write(), lock.read():
+        pass
+    with lock.read(), lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    with lock.write():
+        pass
+
+
+def test_concurrent_changes_and_scans_keep_the_book_consistent():
+    book = AddressBook()
+    book.enable_locking()
+    errors = []
+
+    def write(start: int):
+        for i in range(start, start + 200):
+            name = f"user{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}"
+            book.add_record(make_contact(name, f"050{i:07d}"))
+
+    def scan():
+        try:
+            for _ in range(50):
+                rows, mtype = book.find_by_prefix("050", limit=None)
+                if mtype == "table":
+                    assert all(row[1].startswith("050") for row in rows)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n * 200,)) for n in range(3)]
+    threads += [threading.Thread(target=scan) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(book) == 600
+    assert len(book.find_by_prefix("050", limit=None)[0]) == 600
+
+
+@pytest.mark.parametrize("storage_class", [JournalStorage, SQLiteStorage])
+def test_flush_during_concurrent_changes_stores_consistent_records(tmp_path, storage_class):
+    storage = storage_class(str(tmp_path / "data"))
+    book, notebook = storage.load()
+    book.enable_locking()
+    notebook.enable_locking()
+    names = [f"user{letter}" for letter in "abcdef"]
+    for name in names:
+        book.add_record(make_contact(name))
+    errors = []
+
+    def write(name: str):
+        record = book.find_or_none(name)
+        for i in range(150):
+            record.add_phone(f"050{i:07d}")
+            if i % 3 == 0:
+                record.remove_phone(f"050{i:07d}")
+
+    def flush():
+        try:
+            while any(thread.is_alive() for thread in writers):
+                storage.flush()
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write, args=(name,)) for name in names]
+    flusher = threading.Thread(target=flush)
+    for thread in writers:
+        thread.start()
+    flusher.start()
+    for thread in writers + [flusher]:
+        thread.join()
+    storage.sync()
+    expected = {name: book.find_or_none(name).phone_values() for name in names}
+    storage.close()
+
+    reopened = storage_class(str(tmp_path / "data"))
+    book, _ = reopened.load()
+    assert not errors
+    assert {name: book.find_or_none(name).phone_values() for name in names} == expected
+    assert len(expected["usera"]) == 100
+    reopened.close()
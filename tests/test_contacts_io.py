@@ -0,0 +1,68 @@
+import pytest
+
+import bulk_commands
+import contacts_io
+from conftest import make_contact
+from record import AddressBook
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    anna = make_contact("anna", "0501234567", "0671234567")
+    anna.add_birthday("29.02.2000")
+    anna.add_email("anna@example.com")
+    # кома, крапка з комою, зворотна скісна риска й лапки потребують екранування
+    anna.add_address('Kyiv, Khreshchatyk 1; flat "5" \\ back')
+    book.add_record(anna)
+    book.add_record(make_contact("bohdan", "0931234567"))
+    return book
+
+
+def contacts(book) -> list:
+    return [record.row() for record in book.values()]
+
+
+@pytest.mark.parametrize("file_name", ["contacts.csv", "contacts.vcf"])
+def test_export_and_import_round_trip(book, tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    assert contacts_io.export_contacts(book, path)["exported"] == 2
+
+    imported = AddressBook()
+    result = contacts_io.import_contacts(imported, path)
+    assert (result["imported"], result["failed"], result["error"]) == (2, 0, None)
+    assert contacts(imported) == contacts(book)
+
+
+def test_folded_vcard_lines_are_joined(tmp_path):
+    path = tmp_path / "contacts.vcf"
+    path.write_text("BEGIN:VCARD\r\nVERSION:3.0\r\nFN:ann\r\n a\r\nTEL:050123\r\n\t4567\r\n"
+                    "ADR:;;Lviv\\, Rynok;;;;\r\nEND:VCARD\r\n", encoding="utf-8", newline="")
+    book = AddressBook()
+    assert contacts_io.import_contacts(book, str(path))["imported"] == 1
+    record = book.find_or_none("anna")
+    assert record.phone_values() == ["0501234567"]
+    assert record.address.value == "Lviv, Rynok"
+
+
+def test_invalid_rows_are_reported_with_their_lines(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text('name,phones,birthday,email,address\nanna,0501234567,,,\n'
+                    'bohdan,123,,,"two\nlines"\ndmytro,0931234567,31.02.2000,,\n', encoding="utf-8")
+    book = AddressBook()
+    result = contacts_io.import_contacts(book, str(path))
+    assert (result["imported"], result["failed"]) == (1, 2)
+    assert result["errors"] == ["line 3: invalid phone '123'", "line 5: invalid birthday '31.02.2000'"]
+
+
+def test_unsupported_format_and_file_errors_are_explained(book, tmp_path):
+    (tmp_path / "contacts.txt").write_text("anna", encoding="utf-8")
+    expected = ("Unsupported file format (.txt). Use .csv or .vcf.", "error")
+    assert bulk_commands.import_contacts([str(tmp_path / "contacts.txt")], book) == expected
+    assert bulk_commands.export_contacts([str(tmp_path / "contacts.txt")], book) == expected
+
+    # каталог на місці файлу не дає його записати
+    (tmp_path / "taken.csv").mkdir()
+    message, mtype = bulk_commands.export_contacts([str(tmp_path / "taken.csv")], book)
+    assert mtype == "error"
+    assert message.startswith(f"Cannot write {tmp_path / 'taken.csv'}: ")
@@ -0,0 +1,116 @@
+import os
+
+from conftest import make_contact
+from storage import JournalStorage
+
+
+def names(addressbook) -> list:
+    return [record.name.value for record in addressbook.values()]
+
+
+def test_flushed_changes_survive_a_crash(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    addressbook.add_record(make_contact("john", "0501234567"))
+    addressbook.add_record(make_contact("mary", "0671234567"))
+    storage.flush()
+    addressbook.delete("john")
+    storage.flush()
+    # процес обірвався: ні close(), ні знімка
+    storage._file.close()
+
+    addressbook, _ = JournalStorage(str(tmp_path / "data.pkl")).load()
+    assert names(addressbook) == ["mary"]
+    assert addressbook.find_or_none("mary").phone_values() == ["0671234567"]
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    addressbook.add_record(make_contact("john", "0501234567"))
+    storage.flush()
+    size = os.path.getsize(storage.journal_file)
+    addressbook.add_record(make_contact("mary", "0671234567"))
+    storage.flush()
+    storage._file.close()
+    with open(storage.journal_file, "r+b") as f:
+        f.truncate(size + (os.path.getsize(storage.journal_file) - size) // 2)
+
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    assert names(addressbook) == ["john"]
+    assert storage.entries == 1
+
+
+def test_compaction_folds_the_journal_into_a_snapshot(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, notebook = storage.load()
+    addressbook.add_record(make_contact("john", "0501234567"))
+    storage.flush()
+    storage.compact(wait=True)
+
+    assert not os.path.exists(storage.journal_file)
+    assert not os.path.exists(storage.old_journal_file)
+    assert storage.entries == 0
+    addressbook, _ = JournalStorage(str(tmp_path / "data.pkl")).load()
+    assert names(addressbook) == ["john"]
+
+
+def test_background_compaction_is_triggered_by_journal_size(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    storage.compact_every = 3
+    addressbook, _ = storage.load()
+    for i, name in enumerate(["anna", "bohdan", "dmytro"]):
+        addressbook.add_record(make_contact(name, f"050000000{i}"))
+        storage.flush()
+    storage.sync()
+
+    assert os.path.exists(storage.filename)
+    assert not os.path.exists(storage.journal_file)
+    addressbook, _ = JournalStorage(str(tmp_path / "data.pkl")).load()
+    assert names(addressbook) == ["anna", "bohdan", "dmytro"]
+
+
+def test_interrupted_compaction_is_finished_on_load(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    addressbook.add_record(make_contact("anna", "0500000001"))
+    storage.close()
+
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    addressbook.add_record(make_contact("bohdan", "0500000002"))
+    storage.flush()
+    storage._file.close()
+    storage._file = None
+    # ущільнення перейменувало журнал, але не встигло записати знімок
+    os.replace(storage.journal_file, storage.old_journal_file)
+    addressbook.find_or_none("anna").add_phone("0500000003")
+    storage.flush()
+    storage._file.close()
+
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    storage.sync()
+    assert names(addressbook) == ["anna", "bohdan"]
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000001", "0500000003"]
+    assert not os.path.exists(storage.old_journal_file)
+    assert not os.path.exists(storage.journal_file)
+
+
+def test_close_writes_the_journal_but_no_snapshot(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    addressbook.add_record(make_contact("anna", "0500000001"))
+    addressbook.add_record(make_contact("bohdan", "0500000002"))
+    storage.close()
+    assert not os.path.exists(storage.filename)
+
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, _ = storage.load()
+    # змінений запис лишається на своєму місці і після відтворення журналу
+    addressbook.find_or_none("anna").add_phone("0671234567")
+    storage.close()
+    addressbook, _ = JournalStorage(str(tmp_path / "data.pkl")).load()
+    assert names(addressbook) == ["anna", "bohdan"]
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000001", "0671234567"]
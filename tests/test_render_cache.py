@@ -0,0 +1,49 @@
+from conftest import make_contact, make_note
+from record import AddressBook, NoteBook
+from render_cache import RenderCache, renders
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RenderCache(2)
+    a, b, c = object(), object(), object()
+    cache.put(a, "a")
+    cache.put(b, "b")
+    assert cache.get(a) == "a"
+    cache.put(c, "c")
+    assert (cache.get(a), cache.get(b), cache.get(c)) == ("a", None, "c")
+    cache.discard(a)
+    assert len(cache) == 1
+
+
+def test_contact_row_is_rendered_again_after_a_change():
+    book = AddressBook()
+    record = make_contact("anna", "0501234567")
+    book.add_record(record)
+    assert record.row() == ["Anna", "0501234567", "-", "-", "-"]
+    # рядок віддається копією, тож зміна списку не псує кеш
+    record.row()[0] = "changed"
+    assert renders.get(record)[0] == "Anna"
+
+    record.edit_phone("0501234567", "0671234567")
+    record.add_email("anna@example.com")
+    assert record.row() == ["Anna", "0671234567", "-", "anna@example.com", "-"]
+
+    book.delete("anna")
+    assert renders.get(record) is None
+
+
+def test_note_text_is_rendered_again_after_a_change():
+    book = NoteBook()
+    note = make_note("Plans", "buy milk", "home")
+    book.add_note(note)
+    before = note.format_for_display()
+    assert renders.get(note) == before
+
+    note.add_tag("shop")
+    after = note.format_for_display()
+    assert after != before and "shop" in after
+    book.edit_note("plans", "buy bread")
+    assert "buy bread" in note.format_for_display()
+
+    book.clear_all_notes()
+    assert renders.get(note) is None
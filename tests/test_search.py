@@ -0,0 +1,79 @@
+import pytest
+
+from conftest import make_contact
+from indexes import TrigramIndex, edit_distance
+from record import AddressBook
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    for name, phone in [("john", "0501234567"), ("jonn", "0501239999"), ("joan", "0671234567"),
+                        ("johnny", "0931234567"), ("mary", "0507654321")]:
+        book.add_record(make_contact(name, phone))
+    return book
+
+
+def names(result: tuple) -> list:
+    rows, mtype = result
+    assert mtype == "table", rows
+    return [row[0] for row in rows]
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("john", "john", 0),
+    ("jhon", "john", 1),
+    ("jonn", "john", 1),
+    ("jon", "john", 1),
+    ("ca", "abc", 3),
+    ("kitten", "sitting", 3),
+])
+def test_edit_distance_counts_a_swap_as_one_edit(a, b, distance):
+    assert edit_distance(a, b) == distance
+    assert edit_distance(b, a) == distance
+
+
+def test_edit_distance_stops_at_the_limit():
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("abcdef", "ab", 2) == 3
+
+
+def test_trigram_search_finds_short_terms_without_shared_trigrams():
+    index = TrigramIndex()
+    for term in ["c", "bc", "cb", "abc", "xyz"]:
+        index.add(term)
+    assert index.search("bc", 1) == [(0, "bc"), (1, "abc"), (1, "c"), (1, "cb")]
+
+
+def test_fuzzy_finds_swapped_letters(book):
+    assert names(book.find_fuzzy("jhon")) == ["John"]
+
+
+def test_fuzzy_ranks_closest_first(book):
+    assert names(book.find_fuzzy("jonh", max_distance=2)) == ["John", "Jonn", "Joan"]
+    assert names(book.find_fuzzy("johny")) == ["John", "Johnny"]
+
+
+def test_fuzzy_follows_changes(book):
+    book.find_fuzzy("mary")
+    book.delete("mary")
+    book.add_record(make_contact("marty"))
+    assert names(book.find_fuzzy("mary")) == ["Marty"]
+
+
+def test_fuzzy_miss(book):
+    assert book.find_fuzzy("zzzz") == ("No contact found.", "warning")
+
+
+def test_prefix_matches_names_and_phones(book):
+    assert names(book.find_by_prefix("joh")) == ["John", "Johnny"]
+    assert names(book.find_by_prefix("050123")) == ["John", "Jonn"]
+    assert names(book.find_by_prefix("jo", limit=2)) == ["Joan", "John"]
+
+
+def test_prefix_follows_changes(book):
+    book.find_by_prefix("jo")
+    book.find_or_none("mary").add_phone("0509990000")
+    book.delete("joan")
+    assert names(book.find_by_prefix("05099")) == ["Mary"]
+    assert names(book.find_by_prefix("jo")) == ["John", "Johnny", "Jonn"]
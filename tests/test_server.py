@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from server import AsyncRWLock, CommandServer
+from storage import JournalStorage
+
+
+def test_async_readers_share_and_writers_exclude():
+    async def scenario():
+        lock = AsyncRWLock()
+        events = []
+
+        async def read(name: str):
+            async with lock.read():
+                events.append(f"{name} in")
+                await asyncio.sleep(0.02)
+                events.append(f"{name} out")
+
+        async def write():
+            async with lock.write():
+                events.append("write in")
+                await asyncio.sleep(0.02)
+                events.append("write out")
+
+        await asyncio.gather(read("a"), read("b"), write())
+        return events
+
+    events = asyncio.run(scenario())
+    # обидва читачі всередині одночасно, письменник — сам
+    assert events[:2] == ["a in", "b in"]
+    assert events[-2:] == ["write in", "write out"]
+
+
+async def send(port: int, lines: list) -> list:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    reports = []
+    for line in lines:
+        writer.write(line.encode("utf-8") + b"\n")
+        await writer.drain()
+        reports.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return reports
+
+
+def test_sessions_share_the_books(tmp_path):
+    storage = JournalStorage(str(tmp_path / "data.pkl"))
+    addressbook, notebook = storage.load()
+    command_server = CommandServer(addressbook, notebook)
+    names = [f"user{letter}" for letter in "abcdefgh"]
+
+    async def scenario():
+        server = await asyncio.start_server(command_server.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            writers = [send(port, [f"add-contact {name} 050000000{i}", "show-all"]) for i, name in enumerate(names)]
+            readers = [send(port, ["find-contact --prefix 050", "hello"]) for _ in range(4)]
+            results = await asyncio.gather(*writers, *readers)
+            notes = await send(port, ['add-note Plans "buy milk" n', "search-notes milk n"])
+        return results, notes
+
+    results, notes = asyncio.run(scenario())
+    for reports in results[:len(names)]:
+        assert reports[0]["status"] == "success"
+        assert reports[1]["status"] == "table"
+    assert all(reports[1]["result"] == "How can I help you?" for reports in results[len(names):])
+    assert len(addressbook) == len(names)
+    # повідомлення команди приходять без кольорів, їх розфарбовує клієнт
+    assert {"text": "The results of the search:", "type": "common"} in notes[1]["messages"]
+
+    storage.close()
+    addressbook, _ = JournalStorage(storage.filename).load()
+    assert sorted(addressbook) == names
@@ -0,0 +1,117 @@
+import os
+
+from conftest import make_contact, make_note
+from storage import JournalStorage
+
+
+def saved_books(tmp_path):
+    """Write three contacts and two notes to a snapshot and open it again."""
+    filename = str(tmp_path / "data.pkl")
+    storage = JournalStorage(filename)
+    addressbook, notebook = storage.load()
+    for i, name in enumerate(["anna", "bohdan", "dmytro"]):
+        addressbook.add_record(make_contact(name, f"050000000{i}"))
+    notebook.add_note(make_note("Plans", "buy milk", "home"))
+    notebook.add_note(make_note("Work", "write report", "job"))
+    storage.compact(wait=True)
+    storage.close()
+    storage = JournalStorage(filename)
+    return storage, *storage.load()
+
+
+def test_nothing_is_read_on_open(tmp_path):
+    _, addressbook, notebook = saved_books(tmp_path)
+    assert addressbook.data == {}
+    assert notebook._notes == {}
+    assert len(addressbook) == 3
+    assert "bohdan" in addressbook
+    assert list(addressbook) == ["anna", "bohdan", "dmytro"]
+
+
+def test_lookup_reads_one_record(tmp_path):
+    _, addressbook, notebook = saved_books(tmp_path)
+    assert addressbook.find_or_none("Bohdan").phone_values() == ["0500000001"]
+    assert list(addressbook.data) == ["bohdan"]
+    assert addressbook.find_or_none("nobody") is None
+    assert notebook.find_note("plans").text.value == "buy milk"
+    assert list(notebook._notes) == ["plans"]
+
+
+def test_page_reads_only_its_records(tmp_path):
+    _, addressbook, _ = saved_books(tmp_path)
+    assert [record.name.value for record in addressbook.page(1, 5)] == ["bohdan", "dmytro"]
+    assert list(addressbook.data) == ["bohdan", "dmytro"]
+
+
+def test_mutations_on_top_of_the_snapshot(tmp_path):
+    storage, addressbook, notebook = saved_books(tmp_path)
+    addressbook.find_or_none("anna").add_phone("0671234567")
+    addressbook.delete("bohdan")
+    addressbook.add_record(make_contact("maria", "0931234567"))
+    notebook.delete_note("Work")
+
+    assert len(addressbook) == 3
+    assert "bohdan" not in addressbook
+    assert list(addressbook) == ["anna", "dmytro", "maria"]
+    assert addressbook.find_by_keyword("0500000002")[0][0][0] == "Dmytro"
+    assert [note.title.value for note in notebook.notes] == ["Plans"]
+
+    storage.flush()
+    storage._file.close()
+    addressbook, notebook = JournalStorage(storage.filename).load()
+    assert [record.name.value for record in addressbook.values()] == ["anna", "dmytro", "maria"]
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000000", "0671234567"]
+    assert notebook.find_note("work") is None
+
+
+def test_compaction_copies_unread_records(tmp_path):
+    storage, addressbook, _ = saved_books(tmp_path)
+    addressbook.find_or_none("dmytro").add_phone("0671234567")
+    storage.compact(wait=True)
+    # решта записів скопійована зі старого знімка без розпаковування
+    assert "anna" not in addressbook.data
+
+    addressbook, notebook = JournalStorage(storage.filename).load()
+    assert [record.name.value for record in addressbook.values()] == ["anna", "bohdan", "dmytro"]
+    assert addressbook.find_or_none("dmytro").phone_values() == ["0500000002", "0671234567"]
+    assert notebook.search_by_tag("job")
+
+
+def test_snapshot_is_replaced_while_a_book_reads_it(tmp_path):
+    storage, addressbook, _ = saved_books(tmp_path)
+    addressbook.find_or_none("anna").add_phone("0671234567")
+    storage.compact(wait=True)
+    # старе відображення лишається дійсним: непрочитані записи читаються як раніше
+    assert addressbook.find_or_none("dmytro").phone_values() == ["0500000002"]
+    storage.close()
+
+    addressbook, _ = JournalStorage(storage.filename).load()
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000000", "0671234567"]
+
+
+def test_mapped_snapshot_that_cannot_be_replaced_is_swapped_on_next_start(tmp_path, monkeypatch):
+    storage, addressbook, _ = saved_books(tmp_path)
+    replace = os.replace
+
+    def windows_replace(src, dst):
+        # так поводиться Windows, поки файл відображений у пам'ять
+        if dst == storage.filename:
+            raise PermissionError(13, "The process cannot access the file")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", windows_replace)
+    addressbook.find_or_none("anna").add_phone("0671234567")
+    storage.compact(wait=True)
+    addressbook.delete("bohdan")
+    storage.compact(wait=True)
+    assert os.path.exists(storage.next_file)
+    assert not os.path.exists(storage.old_journal_file)
+    assert addressbook.find_or_none("dmytro").phone_values() == ["0500000002"]
+    storage.close()
+    monkeypatch.setattr(os, "replace", replace)
+
+    storage = JournalStorage(storage.filename)
+    addressbook, _ = storage.load()
+    assert not os.path.exists(storage.next_file)
+    assert list(addressbook) == ["anna", "dmytro"]
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000000", "0671234567"]
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+from conftest import make_contact, make_note
+from storage import SQLiteStorage
+
+
+def saved_books(tmp_path):
+    """Write three contacts and two notes to a database and open it again."""
+    filename = str(tmp_path / "data.db")
+    storage = SQLiteStorage(filename)
+    addressbook, notebook = storage.load()
+    for i, name in enumerate(["anna", "bohdan", "dmytro"]):
+        addressbook.add_record(make_contact(name, f"050000000{i}"))
+    birthday = date.today() + timedelta(days=3)
+    addressbook.find_or_none("bohdan").add_birthday(birthday.replace(year=2000).strftime("%d.%m.%Y"))
+    addressbook.find_or_none("dmytro").add_email("dmytro@example.com")
+    notebook.add_note(make_note("Plans", "buy milk", "home"))
+    notebook.add_note(make_note("Work", "write report", "job"))
+    storage.close()
+    storage = SQLiteStorage(filename)
+    return storage, *storage.load()
+
+
+def test_nothing_is_read_on_open(tmp_path):
+    _, addressbook, notebook = saved_books(tmp_path)
+    assert addressbook.data == {}
+    assert notebook._notes == {}
+    assert len(addressbook) == 3
+    assert list(addressbook) == ["anna", "bohdan", "dmytro"]
+    assert "bohdan" in addressbook
+
+
+def test_lookups_read_only_the_found_rows(tmp_path):
+    _, addressbook, notebook = saved_books(tmp_path)
+    rows, _ = addressbook.get_upcoming_birthdays(7)
+    assert [row[0] for row in rows] == ["Bohdan"]
+    assert list(addressbook.data) == ["bohdan"]
+    found = notebook.search_by_tag("job")
+    assert list(notebook._notes) == ["work"]
+    assert found == [notebook.find_note("work").format_for_display()]
+
+    assert addressbook.find_by_keyword("dmytro@example.com")[0][0][0] == "Dmytro"
+    assert addressbook.who_is("050 000 00 00")[0][0][0] == "Anna"
+    assert list(addressbook.data) == ["bohdan", "dmytro", "anna"]
+
+
+def test_changes_are_written_as_rows(tmp_path):
+    storage, addressbook, notebook = saved_books(tmp_path)
+    addressbook.find_or_none("anna").add_phone("0671234567")
+    addressbook.delete("bohdan")
+    addressbook.add_record(make_contact("maria", "0931234567"))
+    notebook.delete_note("PLANS")
+    notebook.add_note(make_note("Ideas", "learn sql", "job"))
+    # запити бачать ще не записані зміни
+    assert addressbook.find_by_keyword("0931234567")[0][0][0] == "Maria"
+    assert addressbook.find_by_keyword("0500000001")[1] == "warning"
+    storage.close()
+
+    storage = SQLiteStorage(storage.filename)
+    addressbook, notebook = storage.load()
+    assert list(addressbook) == ["anna", "dmytro", "maria"]
+    assert addressbook.find_or_none("anna").phone_values() == ["0500000000", "0671234567"]
+    assert notebook.find_note("plans") is None
+    assert len(notebook.search_by_tag("job")) == 2
+    storage.close()
+
+
+def test_clear_removes_every_row(tmp_path):
+    storage, addressbook, notebook = saved_books(tmp_path)
+    addressbook.clear_all_contacts()
+    notebook.clear_all_notes()
+    storage.close()
+
+    storage = SQLiteStorage(storage.filename)
+    addressbook, notebook = storage.load()
+    assert len(addressbook) == 0
+    assert addressbook.find_by_keyword("0500000000")[1] == "warning"
+    assert notebook.search_by_tag("home") == []
+    storage.close()
@@ -0,0 +1,66 @@
+import pytest
+
+from conftest import make_contact
+from record import AddressBook
+from storage import SQLiteStorage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def book(request, monkeypatch, tmp_path):
+    monkeypatch.setattr(AddressBook, "unique_phones", True)
+    storage = None
+    if request.param == "sqlite":
+        # телефони перевіряються запитами до таблиці phones
+        storage = SQLiteStorage(str(tmp_path / "assistant.db"))
+        book, _ = storage.load()
+    else:
+        book = AddressBook()
+    book.add_record(make_contact("john", "0501234567"))
+    book.add_record(make_contact("mary", "0671234567"))
+    yield book
+    if storage is not None:
+        storage.close()
+
+
+def test_add_phone_of_another_contact_is_rejected(book):
+    message, mtype = book.find_or_none("mary").add_phone("+38 (050) 123-45-67")
+    assert mtype == "warning"
+    assert "John" in message
+    assert book.find_or_none("mary").phone_values() == ["0671234567"]
+
+
+def test_edit_phone_to_another_contacts_phone_is_rejected(book):
+    message, mtype = book.find_or_none("mary").edit_phone("0671234567", "0501234567")
+    assert mtype == "warning"
+    assert "John" in message
+    assert book.phone_owners("0501234567") == ["john"]
+    assert book.phone_owners("0671234567") == ["mary"]
+
+
+def test_own_and_freed_phones_are_accepted(book):
+    mary = book.find_or_none("mary")
+    assert mary.edit_phone("0671234567", "0671234567")[1] == "success"
+    book.find_or_none("john").remove_phone("0501234567")
+    assert mary.add_phone("0501234567")[1] == "success"
+    assert book.phone_owners("0501234567") == ["mary"]
+
+
+def test_add_records_skips_records_with_taken_phones(book):
+    added = book.add_records([
+        make_contact("anna", "0931234567"),
+        make_contact("bohdan", "0939999999", "0671234567"),
+        # запис з тим самим ім'ям замінює старий разом з його телефонами
+        make_contact("john", "0501234567", "0505555555"),
+    ])
+    assert added == 2
+    assert "bohdan" not in book
+    assert book.find_or_none("john").phone_values() == ["0501234567", "0505555555"]
+    assert book.phone_owners("0939999999") == []
+
+
+def test_phones_may_repeat_without_the_setting(monkeypatch):
+    monkeypatch.setattr(AddressBook, "unique_phones", False)
+    book = AddressBook()
+    book.add_record(make_contact("john", "0501234567"))
+    assert book.add_records([make_contact("mary", "0501234567")]) == 1
+    assert book.phone_owners("050 123 45 67") == ["john", "mary"]
@@ -1,75 +1,167 @@
-from colorama import init, Fore, Style
-from prompt_toolkit import prompt
-from prompt_toolkit.completion import Completer, Completion
+import sys
+import threading
+from collections import deque
+from functools import cache
 
-init(autoreset=True)
+import commands
 
 
-commands = ["hello", "help", "exit", "close", "add-contact", "change-contact", "show-phone", "delete-contact",
-            "show-all", "add-address", "show-address", "change-address", "delete-address", "add-email",
-            "change-email", "show-email", "delete-email", "add-birthday", "show-birthday", "birthdays", "add-note",
-            "find-note", "edit-note", "delete-note", "show-all-notes", "search-notes", "import-note",
-            "clear-all-notes", "remove-tag", "sort-by-tag", "search-by-tag", "show-tags", "clear-all-tags",
-            "remove-tag-from-all", "clear-all-contacts", "find-contact", "add-tag"]
+class LazyColors:
+    """
+    Stand-in for colorama's Fore or Style.
 
+    colorama is imported and initialised only when the first color is used,
+    so runs that print nothing colored do not pay for it.
+    """
 
-class FirstWordCompleter(Completer):
-    def get_completions(self, document, complete_event):
-        text_before_cursor = document.text_before_cursor.lstrip()
-        words = text_before_cursor.split()
+    def __init__(self, name: str):
+        self._name = name
 
-        if len(words) == 0 or (len(words) == 1 and not text_before_cursor.endswith(' ')):
-            for cmd in commands:
-                if cmd.startswith(words[0] if words else ''):
-                    yield Completion(cmd, start_position=-len(words[0]) if words else 0)
+    def __getattr__(self, attr: str) -> str:
+        import colorama
+        if not LazyColors._initialised:
+            colorama.init(autoreset=True)
+            LazyColors._initialised = True
+        value = getattr(getattr(colorama, self._name), attr)
+        setattr(self, attr, value)
+        return value
+
+    _initialised = False
+
+
+Fore = LazyColors("Fore")
+Style = LazyColors("Style")
+
+# Відповіді на запитання в пакетному режимі та режимі сервера, окремі для кожного потоку
+_script = threading.local()
+
+
+@cache
+def first_word_completer():
+    """Build the prompt_toolkit completer of command names once, on the first prompt."""
+    from prompt_toolkit.completion import Completer, Completion
+
+    class FirstWordCompleter(Completer):
+        def get_completions(self, document, complete_event):
+            text_before_cursor = document.text_before_cursor.lstrip()
+            words = text_before_cursor.split()
+
+            if len(words) == 0 or (len(words) == 1 and not text_before_cursor.endswith(' ')):
+                for cmd in commands.names():
+                    if cmd.startswith(words[0] if words else ''):
+                        yield Completion(cmd, start_position=-len(words[0]) if words else 0)
+
+    return FirstWordCompleter()
 
 
 def main_user_input():
-    user_prompt = prompt("Write a command: ", completer=FirstWordCompleter())
+    # без терміналу (перенаправлений stdin) prompt_toolkit не потрібен
+    if not sys.stdin.isatty():
+        try:
+            return input("Write a command: ").split(" ")
+        except EOFError:
+            return ["exit"]
+    from prompt_toolkit import prompt
+    user_prompt = prompt("Write a command: ", completer=first_word_completer())
     return user_prompt.split(" ")
 
 
+def set_script_answers(answers, messages: list | None = None) -> None:
+    """
+    Answer the next questions of the current thread from the list instead of asking the user.
+
+    Questions left without an answer get an empty one; None switches back
+    to reading the keyboard.
+
+    Args:
+        answers: Answers in the order of the questions, or None.
+        messages (list | None): List to collect printed messages into instead of stderr.
+    """
+    _script.answers = None if answers is None else deque(answers)
+    _script.messages = messages
+
+
+def _scripted() -> bool:
+    return getattr(_script, "answers", None) is not None
+
+
+def _script_answer() -> str:
+    return _script.answers.popleft() if _script.answers else ""
+
+
 def user_input(prompt_str: str) -> str:
+    if _scripted():
+        return _script_answer()
     return input(f"{Fore.MAGENTA}{prompt_str}{Style.RESET_ALL}")
 
 
+def _collect(message: str, mtype: str) -> bool:
+    """In server mode keep the plain message and its type, the client colors it."""
+    if not _scripted() or _script.messages is None:
+        return False
+    _script.messages.append({"text": message, "type": mtype})
+    return True
+
+
 def user_output(message: str, status: str = "info") -> None:
+    if _collect(message, status):
+        return
     color = {
         "info": Fore.GREEN,
         "error": Fore.RED,
         "warning": Fore.YELLOW
     }.get(status, Fore.WHITE)
 
-    print(f"{color}{message}{Style.RESET_ALL}")
-
-    # ui_helpers.py
+    if not _scripted():
+        print(f"{color}{message}{Style.RESET_ALL}")
+    else:
+        # у пакетному режимі stdout зайнятий результатами команд
+        print(f"{color}{message}{Style.RESET_ALL}", file=sys.stderr)
+
+
+def output(message: str, mtype: str):
+    if mtype == 'common list':
+        for m in message:
+            output(m, 'common')
+    elif _collect(message, mtype):
+        pass
+    elif mtype == 'success':
+        user_output(Fore.GREEN + message + Style.RESET_ALL)
+    elif mtype == 'warning':
+        user_output(Fore.YELLOW + message + Style.RESET_ALL)
+    elif mtype == 'error':
+        user_output(Fore.RED + message + Style.RESET_ALL)
+    elif mtype == 'common':
+        user_output(Fore.BLUE + message + Style.RESET_ALL)
+    else:
+        user_output(message)
 
 
 def ask_and_get_value(question: str) -> str | None:
+    if _scripted():
+        return _script_answer().strip() or None
     print(f"{Fore.CYAN}{question} (Press Enter to skip):{Style.RESET_ALL}")
     answer = input("> ").strip()
     return answer if answer else None
 
 
 def extend_contact_interactive(record, book):
-    from assistant import add_birthday, add_email, address  # уникнути циклічного імпорту
-
     name = record.name.value
 
     bday = ask_and_get_value("Would you like to add a birthday?")
     if bday:
-        message = add_birthday([name, bday], book)
+        message = commands.get("add-birthday").run([name, bday], book, None)
         if message[1] in ("warning", "error"):
-            print(Fore.YELLOW + message[0] + Style.RESET_ALL)
+            user_output(message[0], "warning")
 
     email = ask_and_get_value("Would you like to add an email?")
     if email:
-        message = add_email([name, email], book)
+        message = commands.get("add-email").run([name, email], book, None)
         if message[1] in ("warning", "error"):
-            print(Fore.YELLOW + message[0] + Style.RESET_ALL)
+            user_output(message[0], "warning")
 
     addr = ask_and_get_value("Would you like to add an address?")
     if addr:
-        message = address([name, addr], book, "add_address")
+        message = commands.get("add-address").run([name, addr], book, None)
         if message[1] in ("warning", "error"):
-            print(Fore.YELLOW + message[0] + Style.RESET_ALL)
+            user_output(message[0], "warning")